@@ -10,6 +10,8 @@ from binance.streams import BinanceSocketManager
 from binance.enums import *
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 import json
+from requests.adapters import HTTPAdapter
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +64,8 @@ class BinanceClient:
                 api_secret=self.api_secret,
                 testnet=self.testnet
             )
+            # Keep pooled keep-alive connections for the sync calls made from the bot's worker threads
+            self.sync_client.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
             
             # Test connection
             await self.client.ping()
@@ -76,6 +80,8 @@ class BinanceClient:
         """Close the client connection"""
         if self.client:
             await self.client.close_connection()
+        if self.sync_client:
+            self.sync_client.close_connection()
     
     def get_account_balance_sync(self) -> Dict[str, float]:
         """Get futures account balance (synchronous)"""
@@ -164,6 +170,25 @@ class BinanceClient:
             logger.error(f"Error getting price for {symbol}: {e}")
             return None
     
+    def get_all_prices_sync(self) -> Dict[str, float]:
+        """Get current prices for all futures symbols in one request (synchronous)"""
+        try:
+            if not self.sync_client:
+                logger.error("Sync client not initialized")
+                return {}
+                
+            tickers = self.sync_client.futures_symbol_ticker()
+            prices = {ticker['symbol']: float(ticker['price']) for ticker in tickers}
+            self._current_prices.update(prices)
+            return prices
+            
+        except BinanceAPIException as e:
+            logger.error(f"API error getting all prices: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error getting all prices: {e}")
+            return {}
+    
     async def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
         try:
@@ -617,6 +642,19 @@ class BinanceClient:
             logger.error(f"Error getting positions: {e}")
             return []
     
+    @staticmethod
+    def positions_to_arrays(positions: List[Dict]) -> Dict[str, np.ndarray]:
+        """Column-wise (structure-of-arrays) view of open positions for vectorised aggregation"""
+        count = len(positions)
+        return {
+            'symbol': np.array([pos['symbol'] for pos in positions], dtype=object),
+            'side': np.array([pos['side'] for pos in positions], dtype=object),
+            'amt': np.fromiter((pos['position_amt'] for pos in positions), dtype=np.float64, count=count),
+            'entry': np.fromiter((pos['entry_price'] for pos in positions), dtype=np.float64, count=count),
+            'upnl': np.fromiter((pos['unrealized_pnl'] for pos in positions), dtype=np.float64, count=count),
+            'pct': np.fromiter((pos['percentage'] for pos in positions), dtype=np.float64, count=count),
+        }
+    
     async def get_open_positions(self) -> List[Dict]:
         """Get all open positions"""
         try:
@@ -43,6 +43,19 @@ class Config:
         self.WEBSOCKET_TIMEOUT = int(os.getenv("WEBSOCKET_TIMEOUT", "30"))
         self.RECONNECT_DELAY = int(os.getenv("RECONNECT_DELAY", "5"))
         
+        # Scan Configuration
+        self.SCAN_INTERVAL = int(os.getenv("SCAN_INTERVAL", "60"))  # fallback cadence when prices are quiet
+        self.PRICE_WAKE_THRESHOLD_PERCENT = float(os.getenv("PRICE_WAKE_THRESHOLD_PERCENT", "0.5"))
+        # Floor between price-triggered scans. A scan costs ~3 REST calls per pair, including a weight-5
+        # positionRisk call, so rescanning too often on a busy market exceeds Binance's 1200 weight/minute
+        self.MIN_SCAN_INTERVAL = int(os.getenv("MIN_SCAN_INTERVAL", str(max(self.SCAN_INTERVAL // 4, 1))))
+        
+        # Webhook Configuration (empty WEBHOOK_URL keeps long polling)
+        self.WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # public HTTPS base URL Telegram posts updates to
+        self.WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+        self.WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+        self.WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+        
         # Default trading pairs - stable and liquid
         self.DEFAULT_PAIRS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT"]
         
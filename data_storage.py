@@ -6,17 +6,42 @@ import json
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import shutil
+import threading
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder when orjson is unavailable
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+def _json_loads(raw: bytes) -> Any:
+    """Decode JSON bytes, preferring orjson"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode an object to indented JSON bytes, preferring orjson"""
+    if orjson is not None:
+        # numpy scalars from the array-based position math would otherwise hit default=str
+        return orjson.dumps(obj, default=str,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, indent=2, default=str).encode()
+
 class DataStorage:
     """Local JSON storage for trading bot data"""
     
     def __init__(self, data_file: str = "trading_data.json"):
         self.data_file = data_file
         self.backup_file = f"{data_file}.backup"
+        # Serializes file reads and writes; write_serialized may run on a worker thread
+        self._write_lock = threading.Lock()
+        # Numbers snapshots from serialize() so an older one never overwrites a newer one on disk
+        self._snapshot_seq = 0
+        self._written_seq = 0
         self.data = {
             "user_settings": {},
             "trades": [],
@@ -39,10 +64,13 @@ class DataStorage:
         """Load data from JSON file"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    loaded_data = json.load(f)
-                    # Merge with default structure to ensure all keys exist
-                    self._merge_dict(self.data, loaded_data)
+                # Never read a file a worker thread is halfway through rewriting
+                with self._write_lock:
+                    with open(self.data_file, 'rb') as f:
+                        raw = f.read()
+                loaded_data = _json_loads(raw)
+                # Merge with default structure to ensure all keys exist
+                self._merge_dict(self.data, loaded_data)
                 logger.info("Trading data loaded successfully")
             else:
                 logger.info("No existing data file found, starting with default data")
@@ -57,9 +85,10 @@ class DataStorage:
         """Load data from backup file"""
         try:
             if os.path.exists(self.backup_file):
-                with open(self.backup_file, 'r') as f:
-                    loaded_data = json.load(f)
-                    self._merge_dict(self.data, loaded_data)
+                with self._write_lock:
+                    with open(self.backup_file, 'rb') as f:
+                        raw = f.read()
+                self._merge_dict(self.data, _json_loads(raw))
                 logger.warning("Data loaded from backup file")
             else:
                 logger.error("No backup file available")
@@ -77,51 +106,80 @@ class DataStorage:
     def _save_data(self):
         """Save data to JSON file"""
         try:
+            self.write_serialized(self.serialize())
+        except Exception as e:
+            logger.error(f"Error saving data: {e}")
+    
+    def serialize(self) -> Tuple[int, bytes]:
+        """Snapshot the current data as numbered JSON bytes; call from the thread that mutates data"""
+        # Update timestamp
+        self.data["last_update"] = datetime.now().isoformat()
+        self._snapshot_seq += 1
+        return self._snapshot_seq, _json_dumps(self.data)
+    
+    def write_serialized(self, snapshot: Tuple[int, bytes]):
+        """Write a snapshot from serialize() to the data file, keeping a backup"""
+        seq, payload = snapshot
+        with self._write_lock:
+            # A newer snapshot is already on disk; writing this one would roll it back
+            if seq <= self._written_seq:
+                logger.debug(f"Skipping stale data snapshot #{seq}")
+                return
+            
             # Create backup before saving
             if os.path.exists(self.data_file):
                 shutil.copy2(self.data_file, self.backup_file)
             
-            # Update timestamp
-            self.data["last_update"] = datetime.now().isoformat()
-            
             # Save to file
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, indent=2, default=str)
-            
-            logger.debug("Data saved successfully")
-            
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            with open(self.data_file, 'wb') as f:
+                f.write(payload)
+            self._written_seq = seq
+        
+        logger.debug("Data saved successfully")
     
     def reload_data(self):
         """Reload data from JSON file"""
         self._load_data()
     
+    def _append_trade(self, trade_data: Dict):
+        """Append a trade record and update statistics without saving"""
+        trade_data["timestamp"] = datetime.now().isoformat()
+        trade_data["id"] = len(self.data["trades"]) + 1
+        
+        self.data["trades"].append(trade_data)
+        
+        # Update statistics
+        self.data["bot_stats"]["total_trades"] += 1
+        if trade_data.get("status") == "closed":
+            pnl = trade_data.get("pnl", 0.0)
+            self.data["bot_stats"]["total_pnl"] += pnl
+            
+            if pnl > 0:
+                self.data["bot_stats"]["winning_trades"] += 1
+            else:
+                self.data["bot_stats"]["losing_trades"] += 1
+    
     def save_trade(self, trade_data: Dict):
         """Save a trade record"""
         try:
-            trade_data["timestamp"] = datetime.now().isoformat()
-            trade_data["id"] = len(self.data["trades"]) + 1
-            
-            self.data["trades"].append(trade_data)
-            
-            # Update statistics
-            self.data["bot_stats"]["total_trades"] += 1
-            if trade_data.get("status") == "closed":
-                pnl = trade_data.get("pnl", 0.0)
-                self.data["bot_stats"]["total_pnl"] += pnl
-                
-                if pnl > 0:
-                    self.data["bot_stats"]["winning_trades"] += 1
-                else:
-                    self.data["bot_stats"]["losing_trades"] += 1
-            
+            self._append_trade(trade_data)
             self._save_data()
             logger.info(f"Trade saved: {trade_data['symbol']} - {trade_data['side']} - {trade_data.get('status', 'open')}")
             
         except Exception as e:
             logger.error(f"Error saving trade: {e}")
     
+    def save_trades_batch(self, trades: List[Dict]):
+        """Save several trade records with a single file write"""
+        try:
+            for trade_data in trades:
+                self._append_trade(trade_data)
+            self._save_data()
+            logger.info(f"Saved batch of {len(trades)} trades")
+            
+        except Exception as e:
+            logger.error(f"Error saving trade batch: {e}")
+    
     def update_trade(self, trade_id: int, updates: Dict):
         """Update an existing trade"""
         try:
@@ -164,8 +222,8 @@ class DataStorage:
             if status:
                 trades = [t for t in trades if t.get("status") == status]
             
-            # Sort by timestamp (newest first)
-            trades.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+            # Sort by timestamp (newest first); a copy, so stored trades are never reordered mid-scan
+            trades = sorted(trades, key=lambda x: x.get("timestamp", ""), reverse=True)
             
             # Apply limit
             if limit:
@@ -305,6 +363,10 @@ class DataStorage:
         except Exception as e:
             logger.error(f"Error saving user settings: {e}")
     
+    def set_user_settings(self, user_id: int, settings: Dict):
+        """Update user settings in memory only; persisted by the next save"""
+        self.data["user_settings"][str(user_id)] = settings
+    
     def get_bot_stats(self) -> Dict:
         """Get bot statistics"""
         try:
@@ -313,8 +375,8 @@ class DataStorage:
             logger.error(f"Error getting bot stats: {e}")
             return {}
     
-    def calculate_current_pnl_with_positions(self, binance_client) -> Dict:
-        """Calculate current P&L including open positions"""
+    def calculate_current_pnl_with_positions(self, prices: Dict[str, Optional[float]]) -> Dict:
+        """Calculate current P&L including open positions, priced from a symbol -> price map"""
         try:
             from utils import calculate_pnl
             
@@ -336,7 +398,7 @@ class DataStorage:
                     side = trade["side"]
                     
                     # Get current price
-                    current_price = binance_client.get_current_price_sync(symbol)
+                    current_price = prices.get(symbol)
                     if current_price:
                         # Calculate P&L for this position
                         pnl = calculate_pnl(entry_price, current_price, quantity, side)
@@ -5,6 +5,7 @@ Risk management module for trading operations
 import logging
 from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -176,20 +177,27 @@ class RiskManager:
         self.daily_trades = 0
         logger.info("Daily trade counters reset")
     
-    def get_risk_metrics(self, current_balance: float, positions: List[Dict]) -> RiskMetrics:
-        """Get current risk metrics"""
+    def get_risk_metrics(self, current_balance: float, positions: List[Dict], *,
+                         total_notional: Optional[float] = None) -> RiskMetrics:
+        """Get current risk metrics; pass total_notional if the caller already summed exposure"""
         try:
-            total_exposure = sum(pos['usdt_value'] for pos in positions)
+            if total_notional is None:
+                total_notional = sum(pos['usdt_value'] for pos in positions)
+            total_exposure = total_notional
             available_balance = current_balance - total_exposure
             max_position_size = self.config.MAX_POSITION_SIZE
             current_drawdown = ((self.peak_balance - current_balance) / self.peak_balance) * 100 if self.peak_balance > 0 else 0
             
-            # Calculate daily and weekly PnL
-            trades = self.data_storage.get_recent_trades(days=1)
-            daily_pnl = sum(trade['pnl'] for trade in trades if trade['status'] == 'closed')
-            
-            trades_weekly = self.data_storage.get_recent_trades(days=7)
-            weekly_pnl = sum(trade['pnl'] for trade in trades_weekly if trade['status'] == 'closed')
+            # Calculate daily and weekly PnL in one pass over the week; the last day is a subset of it
+            day_cutoff = datetime.now() - timedelta(days=1)
+            daily_pnl = 0.0
+            weekly_pnl = 0.0
+            for trade in self.data_storage.get_recent_trades(days=7):
+                if trade['status'] != 'closed':
+                    continue
+                weekly_pnl += trade['pnl']
+                if datetime.fromisoformat(trade['timestamp']) >= day_cutoff:
+                    daily_pnl += trade['pnl']
             
             return RiskMetrics(
                 total_exposure=total_exposure,
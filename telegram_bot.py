@@ -4,12 +4,30 @@ Telegram bot interface for the trading bot using telebot
 
 import logging
 import asyncio
-from typing import Dict, List, Optional
-from datetime import datetime
-import telebot
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from telebot import types
-import threading
+from telebot.async_telebot import AsyncTeleBot
+from telebot import asyncio_helper
+from telebot.asyncio_helper import ApiTelegramException
+import aiohttp
+from aiohttp import web
+
+try:
+    import orjson
+except ImportError:  # Fall back to telebot's stdlib parsing when orjson is unavailable
+    orjson = None
 import time
+from signal import SIGINT, SIGTERM
+import random
+import hashlib
+import re
+import functools
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from bisect import bisect_left
 
 from binance_client import BinanceClient
 from trading_strategy import TrendFollowingStrategy, SignalType
@@ -17,105 +35,37 @@ from risk_manager import RiskManager
 from data_storage import DataStorage
 from websocket_handler import WebSocketHandler
 from config import Config
-from utils import format_number, format_percentage, calculate_pnl
+from utils import format_number, format_percentage, calculate_pnl, TTLCache
 
 logger = logging.getLogger(__name__)
 
-class TradingBot:
-    """Main Telegram bot for trading interface"""
-    
-    def __init__(self, config: Config):
-        self.config = config
-        self.bot = telebot.TeleBot(config.TELEGRAM_BOT_TOKEN)
-        
-        # Initialize components
-        self.data_storage = DataStorage(config.DATA_FILE)
-        self.binance_client = BinanceClient(
-            config.BINANCE_API_KEY,
-            config.BINANCE_API_SECRET,
-            config.BINANCE_TESTNET
-        )
-        self.risk_manager = RiskManager(config, self.data_storage)
-        self.strategy = TrendFollowingStrategy(self.binance_client, config, self.data_storage)
-        self.websocket_handler = WebSocketHandler(self.binance_client)
-        
-        # Bot state
-        self.is_trading_active = False
-        self.monitoring_symbols = config.DEFAULT_PAIRS.copy()
-        
-        # Cache for symbols and user sessions
-        self._cached_symbols = None
-        self._user_search_sessions = {}  # user_id -> {"symbols": [...], "search_query": ""}
-        
-        # Setup message handlers
-        self._setup_handlers()
-        self._setup_search_handler()
-        
-    def _setup_handlers(self):
-        """Setup message and callback handlers"""
-        
-        @self.bot.message_handler(commands=['start'])
-        def start_command(message):
-            self.handle_start_command(message)
-            
-        @self.bot.message_handler(commands=['help'])
-        def help_command(message):
-            self.handle_help_command(message)
-            
-        @self.bot.message_handler(commands=['balance'])
-        def balance_command(message):
-            def run_async():
-                asyncio.run(self.handle_balance_command(message))
-            thread = threading.Thread(target=run_async)
-            thread.start()
-            
-        @self.bot.message_handler(commands=['positions'])
-        def positions_command(message):
-            def run_async():
-                asyncio.run(self.handle_positions_command(message))
-            thread = threading.Thread(target=run_async)
-            thread.start()
-            
-        @self.bot.message_handler(commands=['trades'])
-        def trades_command(message):
-            def run_async():
-                asyncio.run(self.handle_trades_command(message))
-            thread = threading.Thread(target=run_async)
-            thread.start()
-            
-        @self.bot.message_handler(commands=['stats'])
-        def stats_command(message):
-            def run_async():
-                asyncio.run(self.handle_stats_command(message))
-            thread = threading.Thread(target=run_async)
-            thread.start()
-            
-        @self.bot.message_handler(commands=['settings'])
-        def settings_command(message):
-            self.handle_settings_command(message)
-            
-        @self.bot.callback_query_handler(func=lambda call: True)
-        def callback_handler(call):
-            def run_async():
-                asyncio.run(self.handle_callback_query(call))
-            thread = threading.Thread(target=run_async)
-            thread.start()
-    
-    def _check_authorization(self, user_id: int) -> bool:
-        """Check if user is authorized"""
-        if not self.config.AUTHORIZED_USERS:
-            return True  # If no authorized users set, allow all
-        return user_id in self.config.AUTHORIZED_USERS
-    
-    def handle_start_command(self, message):
-        """Handle /start command"""
-        user_id = message.from_user.id
-        
-        if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
-            return
-        
-        welcome_text = """
+# Search messages arriving within this window are collapsed into the latest one
+SEARCH_DEBOUNCE_SECONDS = 0.2
+# Pair toggles within this window are saved and redrawn together
+TOGGLE_DEBOUNCE_SECONDS = 0.3
+TRADING_MAX_BACKOFF = 300.0  # seconds between retries after consecutive trading loop errors
+TRADING_BUG_ERRORS = (AttributeError, NameError, TypeError)  # errors a retry cannot fix
+SETTINGS_FLUSH_INTERVAL = 1.0  # seconds between write-behind saves of changed user settings
+
+# Pairs pagination; searches stop scanning once this many pages of matches exist
+PAIRS_PER_PAGE = 5
+MAX_SEARCH_PAGES = 20
+REST_CACHE_TTL = 2.0  # seconds a Binance REST result is reused across rapid clicks
+TELEGRAM_SEND_RETRIES = 3  # attempts after a 429 before giving up
+TELEGRAM_MAX_BACKOFF = 30.0  # seconds
+TELEGRAM_LONG_POLL_TIMEOUT = 50  # seconds each getUpdates may wait for new updates
+TELEGRAM_REQUEST_TIMEOUT = 60  # seconds before a getUpdates request counts as hung; must exceed the long poll
+TELEGRAM_ALLOWED_UPDATES = ['message', 'callback_query']  # the only update types with handlers
+PRICE_FETCH_TIMEOUT = 3.0  # seconds to wait for a single symbol's price
+PRICE_CACHE_MAX_AGE = 5.0  # seconds a streamed ticker price is trusted before falling back to REST
+BALANCE_CACHE_TTL = 5.0  # seconds the USDT balance is shared between signals of one scan
+SIGNAL_CONCURRENCY = 5  # exit signals handled at once, to stay within Binance order rate limits
+MESSAGE_CHUNK_LIMIT = 3500  # characters per message, leaving headroom under Telegram's 4096
+SOA_MIN_POSITIONS = 20  # below this, plain Python loops beat numpy conversion overhead
+
+UNAUTHORIZED_TEXT = "❌ Ви не авторизовані для використання цього бота."
+
+WELCOME_TEXT = """
 🚀 **Торговий бот Binance Futures**
 
 Вітаємо у вашому автоматизованому торговому помічнику!
@@ -136,32 +86,14 @@ class TradingBot:
 
 Використовуйте кнопки нижче для швидкої навігації:
         """
-        
-        keyboard = types.InlineKeyboardMarkup(row_width=2)
-        keyboard.add(
-            types.InlineKeyboardButton("💰 Баланс", callback_data="balance"),
-            types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
-        )
-        keyboard.add(
-            types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"),
-            types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading")
-        )
-        keyboard.add(
-            types.InlineKeyboardButton("📈 Статистика", callback_data="stats"),
-            types.InlineKeyboardButton("⚙️ Налаштування", callback_data="settings")
-        )
-        
-        self.bot.send_message(message.chat.id, welcome_text, parse_mode='Markdown', reply_markup=keyboard)
-    
-    def handle_help_command(self, message):
-        """Handle /help command"""
-        user_id = message.from_user.id
-        
-        if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
-            return
-        
-        help_text = """
+
+MAIN_MENU_TEXT = """
+🚀 **Торговий бот Binance Futures**
+
+З поверненням! Використовуйте кнопки нижче для швидкої навігації:
+        """
+
+HELP_TEXT = """
 📚 **Команди та функції бота**
 
 **Торгові команди:**
@@ -209,81 +141,601 @@ class TradingBot:
 
 Для підтримки, будь ласка, перевірте логи або зверніться до адміністратора.
         """
+
+BALANCE_TEMPLATE = """
+💰 **Баланс рахунку**
+
+**Баланс USDT:** `{usdt} USDT`
+**Нереалізований P&L:** `{upnl} USDT`
+**Загальний портфель:** `{total} USDT`
+
+**Метрики ризику:**
+• Доступний баланс: `{available} USDT`
+• Загальна експозиція: `{exposure} USDT`
+• Поточна просадка: `{drawdown}%`
+• Щоденний P&L: `{daily_pnl} USDT`
+
+**Інші активи:**
+            """
+
+STATS_TEMPLATE = """
+📈 **Статистика торгівлі**
+
+**Загальна продуктивність:**
+• Всього торгів: `{total_trades}`
+• Прибуткові торги: `{winning_trades}`
+• Збиткові торги: `{losing_trades}`
+• Відсоток виграшів: `{win_rate}%`
+• Загальний P&L: `{total_pnl} USDT`
+
+**Детальний P&L:**
+• Реалізований P&L: `{realized_pnl} USDT` (закриті торги: {closed_trades})
+• Нереалізований P&L: `{unrealized_pnl} USDT` (відкриті позиції: {open_positions})
+
+**Недавня продуктивність:**
+• Торгів за день: `{daily_trades}`
+• Денний P&L: `{daily_pnl} USDT`
+• Тижневий P&L: `{weekly_pnl} USDT`
+
+**Статус бота:**
+• Торгівля активна: `{trading_active}`
+• Відстежувані символи: `{symbols_count}`
+• Рівень ризику: `{risk_level}`
+            """
+
+SETTINGS_TEMPLATE = """
+        ⚙️ **Налаштування Бота**
+
+        **Ризик-менеджмент:**
+        • Сума за замовчуванням: `{trade_amount} USDT`
+        • Максимальний розмір позиції: `{max_position} USDT`
+        • Стоп-лосс: `{stop_loss}%`
+        • Тейк-профіт: `{take_profit}%`
+        • Максимальна просадка: `{max_drawdown}%`
+
+        **Параметри Стратегії:**
+        • Період Тренду: `{trend_period}`
+        • Період RSI: `{rsi_period}`
+        • RSI Перепроданий: `{rsi_oversold}`
+        • RSI Перекуплений: `{rsi_overbought}`
+
+        **Система:**
+        • Режим Тестнет: `{testnet}`
+        • Моніторинг Парами: `{symbols_count}`
+        • Авто Торгівля: `{trading_active}`
+            """
+
+MODIFY_SETTINGS_TEMPLATE = """
+🔧 **Налаштування Торгівлі**
+
+**Поточні параметри:**
+• Розмір позиції: {trade_amount} USDT
+• Максимальна позиція: {max_position} USDT
+• Максимальна просадка: {max_drawdown}%
+• Стоп-лосс: {stop_loss}%
+• Тейк-профіт: {take_profit}%
+
+**Стратегія:**
+• Період тренду: {trend_period}
+• Період RSI: {rsi_period}
+• RSI перепроданість: {rsi_oversold}
+• RSI перекупленість: {rsi_overbought}
+
+**Мережа:** {network}
+**Статус торгівлі:** {trading_status}
+
+ℹ️ Для зміни параметрів відредагуйте файл .env та перезапустіть бота
+"""
+
+@functools.lru_cache(maxsize=256)
+def _format_trade_time(timestamp: str) -> str:
+    """Short display time for an ISO trade timestamp, memoized across /trades calls"""
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%m/%d %H:%M")
+    except (ValueError, TypeError):
+        return "N/A"
+
+@dataclass(slots=True)
+class SearchSession:
+    """Per-user state of the pairs selection / search flow"""
+    symbols: Sequence[str] = ()  # read-only; may be the shared symbol tuple
+    search_query: str = ""
+    truncated: bool = False
+    search_message_id: Optional[int] = None
+    original_message_id: Optional[int] = None
+    pending_message_id: Optional[int] = None  # id of the newest search input still settling
+    last_query: str = ""
+    last_filtered: Optional[Sequence[str]] = None
+    last_page_hash: Optional[int] = None  # hash of the pairs page currently on screen, query included
+    symbol_index: Optional[Dict[str, int]] = None  # position of each entry of symbols, built on demand
+    page: Optional[int] = None  # pairs page currently on screen
+    page_message: Optional[tuple] = None  # (chat_id, message_id) showing that page
+    page_text: str = ""
+    selected_info: Optional[tuple] = None  # (selected count, rendered "selected pairs" line)
+    keyboard: Optional[types.InlineKeyboardMarkup] = None  # markup of that page, patched in place on toggle
+
+class _FakeChat:
+    """Minimal stand-in for a Telegram chat"""
+    __slots__ = ('id',)
+    
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+
+class _FakeUser:
+    """Minimal stand-in for a Telegram user"""
+    __slots__ = ('id',)
+    
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+class _FakeMsg:
+    """Minimal stand-in for a Telegram message"""
+    __slots__ = ('chat', 'message_id', 'from_user')
+    
+    def __init__(self, chat_id: int, message_id: int, user_id: Optional[int] = None):
+        self.chat = _FakeChat(chat_id)
+        self.message_id = message_id
+        self.from_user = _FakeUser(user_id) if user_id is not None else None
+    
+    @classmethod
+    def from_call(cls, call) -> "_FakeMsg":
+        """Message-like view of a callback: the chat it came from and the user who pressed the button"""
+        return cls(call.message.chat.id, call.message.message_id, call.from_user.id)
+
+class _FakeCall:
+    """Callback-like object used to re-render pages outside of a real callback"""
+    __slots__ = ('message', 'from_user', 'id')
+    
+    def __init__(self, chat_id: int, message_id: int, user_id: int):
+        self.message = _FakeMsg(chat_id, message_id)
+        self.from_user = _FakeUser(user_id)
+        self.id = "fake_search_call"
+
+class TradingBot:
+    """Main Telegram bot for trading interface"""
+    
+    def __init__(self, config: Config):
+        self.config = config
+        self.bot = AsyncTeleBot(config.TELEGRAM_BOT_TOKEN)
         
-        self.bot.send_message(message.chat.id, help_text, parse_mode='Markdown')
+        # Initialize components
+        self.data_storage = DataStorage(config.DATA_FILE)
+        self.binance_client = BinanceClient(
+            config.BINANCE_API_KEY,
+            config.BINANCE_API_SECRET,
+            config.BINANCE_TESTNET
+        )
+        self.risk_manager = RiskManager(config, self.data_storage)
+        self.strategy = TrendFollowingStrategy(self.binance_client, config, self.data_storage)
+        self.websocket_handler = WebSocketHandler(self.binance_client, config.PRICE_WAKE_THRESHOLD_PERCENT)
+        
+        # Authorized user ids as a set for O(1) checks; None allows everyone
+        self._authorized = frozenset(config.AUTHORIZED_USERS) if config.AUTHORIZED_USERS else None
+        # Recipients of trade notifications, in configured order
+        self._notify_user_ids = tuple(config.AUTHORIZED_USERS or ())
+        
+        # Bot state; the trading loop waits on this event while trading is stopped
+        self._trading_event = asyncio.Event()
+        self.monitoring_symbols = config.DEFAULT_PAIRS
+        
+        # Cache for symbols and user sessions
+        self._cached_symbols = None
+        self._symbols_upper_cache = ()  # immutable upper-cased view of _cached_symbols for search
+        self._symbols_sorted = []  # sorted _symbols_upper_cache, prefix matches are a contiguous slice
+        self._symbol_index: Dict[str, int] = {}  # symbol -> position in _symbols_upper_cache
+        self._symbols_by_char = {}  # char -> symbols containing it, narrows substring search
+        self._symbols_version = 0  # bumped whenever the symbol list changes to bust search memoization
+        # user_id -> SearchSession; abandoned sessions expire on their own
+        self._user_search_sessions = TTLCache(maxsize=10_000, ttl=600)
+        # (chat_id, message_id) -> digest of the last pairs page sent to that message
+        self._last_rendered = TTLCache(maxsize=10_000, ttl=600)
+        
+        self._trading_task: Optional[asyncio.Task] = None
+        # Set by SIGTERM/SIGINT; start() awaits it alongside polling instead of looping
+        self._shutdown_event = asyncio.Event()
+        # Webhook mode: Telegram's secret header value, and handler tasks kept referenced until done
+        self._webhook_secret = config.WEBHOOK_SECRET or hashlib.sha256(config.TELEGRAM_BOT_TOKEN.encode()).hexdigest()[:32]
+        self._webhook_tasks: set = set()
+        # Trade records waiting to be written to disk by _trade_writer
+        self._trade_write_q: asyncio.Queue = asyncio.Queue()
+        self._trade_writer_task: Optional[asyncio.Task] = None
+        # Users whose settings changed in memory since the last write
+        self._dirty_users: set = set()
+        # Held while settings are written or the data file is reloaded, so neither overlaps the other
+        self._settings_lock = asyncio.Lock()
+        self._settings_flusher_task: Optional[asyncio.Task] = None
+        # (method, args) -> (fetched_at, result) for short-lived Binance REST results
+        self._rest_cache: Dict[tuple, tuple] = {}
+        # Callbacks / commands currently being handled, keyed per user
+        self._inflight: set = set()
+        # user_id -> symbols toggled but not yet saved (dict as an ordered set), with the latest call to redraw
+        self._toggle_queue: Dict[int, Dict[str, None]] = {}
+        self._toggle_calls: Dict[int, object] = {}
+        self._toggle_tasks: Dict[int, asyncio.Task] = {}
+        # Small bounded pool for blocking per-symbol Binance REST calls
+        self._io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="binance_io")
+        
+        # callback_data -> handler; paginated/per-symbol callbacks are matched by prefix
+        self._callback_routes = {
+            "balance": self.handle_balance_callback,
+            "positions": self.handle_positions_callback,
+            "trades": self.handle_trades_callback,
+            "stats": self.handle_stats_callback,
+            "settings": self.handle_settings_callback,
+            "start_trading": self.handle_start_trading_callback,
+            "stop_trading": self.handle_stop_trading_callback,
+            "close_all_positions": self.handle_close_all_positions_callback,
+            "main_menu": self.handle_main_menu_callback,
+            "view_pairs": self.handle_view_pairs_callback,
+            "search_pairs": self.handle_search_pairs_callback,
+            "clear_search": self.handle_clear_search_callback,
+            "modify_settings": self.handle_modify_settings_callback,
+            "apply_pairs": self.handle_apply_pairs_callback,
+            "reset_pairs": self.handle_reset_pairs_callback,
+        }
+        self._callback_prefixes = (
+            ("pairs_page_", self.handle_pairs_page_callback),
+            ("toggle_pair_", self.handle_toggle_pair_callback),
+        )
+        
+        self._build_static_keyboards()
+        self._build_static_texts()
+        
+        # Setup message handlers
+        self._setup_handlers()
+        self._setup_search_handler()
+        
+    def _setup_handlers(self):
+        """Setup message and callback handlers"""
+        
+        @self.bot.message_handler(commands=['start'])
+        async def start_command(message):
+            await self._run_command_once(self.handle_start_command, message)
+            
+        @self.bot.message_handler(commands=['help'])
+        async def help_command(message):
+            await self._run_command_once(self.handle_help_command, message)
+            
+        @self.bot.message_handler(commands=['balance'])
+        async def balance_command(message):
+            await self._run_command_once(self.handle_balance_command, message)
+            
+        @self.bot.message_handler(commands=['positions'])
+        async def positions_command(message):
+            await self._run_command_once(self.handle_positions_command, message)
+            
+        @self.bot.message_handler(commands=['trades'])
+        async def trades_command(message):
+            await self._run_command_once(self.handle_trades_command, message)
+            
+        @self.bot.message_handler(commands=['stats'])
+        async def stats_command(message):
+            await self._run_command_once(self.handle_stats_command, message)
+            
+        @self.bot.message_handler(commands=['settings'])
+        async def settings_command(message):
+            await self._run_command_once(self.handle_settings_command, message)
+            
+        @self.bot.callback_query_handler(func=lambda call: True)
+        async def callback_handler(call):
+            await self.handle_callback_query(call)
+    
+    @property
+    def monitoring_symbols(self) -> List[str]:
+        """Symbols the trading loop scans; replace rather than mutate so cached summaries stay valid"""
+        return self._monitoring_symbols
+    
+    @monitoring_symbols.setter
+    def monitoring_symbols(self, symbols):
+        # Copy once here and precompute what the status messages show
+        self._monitoring_symbols = list(symbols)
+        self._monitoring_len = len(self._monitoring_symbols)
+        self._monitoring_preview = ', '.join(self._monitoring_symbols[:3]) + ('...' if self._monitoring_len > 3 else '')
+    
+    @property
+    def is_trading_active(self) -> bool:
+        """Whether automatic trading is currently enabled"""
+        return self._trading_event.is_set()
+    
+    def _build_static_keyboards(self):
+        """Build the inline keyboards that never change between messages"""
+        self._main_menu_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._main_menu_kb.add(
+            types.InlineKeyboardButton("💰 Баланс", callback_data="balance"),
+            types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
+        )
+        self._main_menu_kb.add(
+            types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"),
+            types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading")
+        )
+        self._main_menu_kb.add(
+            types.InlineKeyboardButton("📈 Статистика", callback_data="stats"),
+            types.InlineKeyboardButton("⚙️ Налаштування", callback_data="settings")
+        )
+        
+        self._balance_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._balance_kb.add(
+            types.InlineKeyboardButton("🔄 Оновити", callback_data="balance"),
+            types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
+        )
+        self._balance_kb.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+        
+        self._positions_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._positions_kb.add(
+            types.InlineKeyboardButton("🔄 Оновити", callback_data="positions"),
+            types.InlineKeyboardButton("💰 Баланс", callback_data="balance")
+        )
+        self._positions_kb.add(
+            types.InlineKeyboardButton("🛑 Закрити все", callback_data="close_all_positions"),
+            types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu")
+        )
+        
+        self._trades_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._trades_kb.add(
+            types.InlineKeyboardButton("📊 Статистика", callback_data="stats"),
+            types.InlineKeyboardButton("💰 Баланс", callback_data="balance")
+        )
+        self._trades_kb.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+        
+        self._stats_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._stats_kb.add(
+            types.InlineKeyboardButton("📝 Останні торги", callback_data="trades"),
+            types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
+        )
+        self._stats_kb.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+        
+        self._settings_kb = types.InlineKeyboardMarkup(row_width=2)
+        self._settings_kb.add(
+            types.InlineKeyboardButton("🔧 Змінити Налаштування", callback_data="modify_settings"),
+            types.InlineKeyboardButton("📋 Переглянути Пари", callback_data="view_pairs")
+        )
+        self._settings_kb.add(
+            types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"),
+            types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading")
+        )
+        self._settings_kb.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+        
+        # Telegram takes reply_markup as JSON; serialize these once instead of on every send
+        for name in ("_main_menu_kb", "_balance_kb", "_positions_kb", "_trades_kb", "_stats_kb", "_settings_kb"):
+            setattr(self, name, getattr(self, name).to_json())
+    
+    def _build_static_texts(self):
+        """Pre-render the config parts of the settings screens; config does not change at runtime"""
+        static_fields = {
+            "trade_amount": format_number(self.config.DEFAULT_TRADE_AMOUNT),
+            "max_position": format_number(self.config.MAX_POSITION_SIZE),
+            "stop_loss": self.config.STOP_LOSS_PERCENT,
+            "take_profit": self.config.TAKE_PROFIT_PERCENT,
+            "max_drawdown": self.config.MAX_DRAWDOWN_PERCENT,
+            "trend_period": self.config.TREND_PERIOD,
+            "rsi_period": self.config.RSI_PERIOD,
+            "rsi_oversold": self.config.RSI_OVERSOLD,
+            "rsi_overbought": self.config.RSI_OVERBOUGHT,
+        }
+        # Runtime fields are left as placeholders for str.format on each call
+        self._settings_template = SETTINGS_TEMPLATE.format_map({
+            **static_fields,
+            "testnet": '✅ Так' if self.config.BINANCE_TESTNET else '❌ Ні',
+            "symbols_count": "{symbols_count}",
+            "trading_active": "{trading_active}",
+        })
+        
+        # The modify screen only varies with the trading state, so render both variants
+        network = "🟢 Testnet" if self.config.BINANCE_TESTNET else "🔴 Mainnet"
+        self._modify_settings_texts = {}
+        self._modify_settings_kbs = {}
+        for active in (True, False):
+            self._modify_settings_texts[active] = MODIFY_SETTINGS_TEMPLATE.format_map({
+                **static_fields,
+                "network": network,
+                "trading_status": "🟢 Активна" if active else "⏸ Зупинена",
+            })
+            keyboard = types.InlineKeyboardMarkup()
+            if active:
+                keyboard.add(types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading"))
+            else:
+                keyboard.add(types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"))
+            keyboard.add(types.InlineKeyboardButton("📋 Переглянути пари", callback_data="view_pairs"))
+            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+            self._modify_settings_kbs[active] = keyboard.to_json()
+    
+    def _cached(self, fn, *args, ttl: float = REST_CACHE_TTL):
+        """Return fn(*args), reusing a result fetched less than ttl seconds ago"""
+        key = (fn.__name__, *args)
+        now = time.monotonic()
+        hit = self._rest_cache.get(key)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        result = fn(*args)
+        self._rest_cache[key] = (now, result)
+        return result
+    
+    async def _run_io(self, fn, *args, **kwargs):
+        """Run a blocking Binance call on _io_pool without holding up the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, functools.partial(fn, *args, **kwargs))
+    
+    async def _cached_io(self, fn, *args, ttl: float = REST_CACHE_TTL):
+        """Awaitable _cached: hits return at once, misses run the blocking call on _io_pool"""
+        hit = self._rest_cache.get((fn.__name__, *args))
+        if hit is not None and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        return await self._run_io(self._cached, fn, *args, ttl=ttl)
+    
+    async def _safe_send(self, fn, *args, **kwargs):
+        """Call a Telegram API method, honouring Retry-After on HTTP 429"""
+        for attempt in range(TELEGRAM_SEND_RETRIES + 1):
+            try:
+                return await fn(*args, **kwargs)
+            except ApiTelegramException as e:
+                if e.error_code != 429 or attempt == TELEGRAM_SEND_RETRIES:
+                    raise
+                retry_after = ((e.result_json or {}).get('parameters') or {}).get('retry_after')
+                if retry_after is not None:
+                    backoff_seconds = min(float(retry_after), TELEGRAM_MAX_BACKOFF)
+                else:
+                    backoff_seconds = min(2 ** attempt + random.random(), TELEGRAM_MAX_BACKOFF)
+                logger.warning(f"⏳ Telegram rate limit on {fn.__name__}, backoff_seconds={backoff_seconds:.1f} "
+                               f"(retry {attempt + 1}/{TELEGRAM_SEND_RETRIES})")
+                await asyncio.sleep(backoff_seconds)
+    
+    def _streamed_prices(self, symbols):
+        """Split symbols into fresh streamed prices and the symbols the stream has no recent tick for"""
+        prices = {}
+        stale = []
+        now = time.monotonic()
+        price_cache = self.websocket_handler.price_cache
+        for symbol in dict.fromkeys(symbols):
+            cached = price_cache.get(symbol)
+            if cached is not None and now - cached[1] <= PRICE_CACHE_MAX_AGE:
+                prices[symbol] = cached[0]
+            else:
+                stale.append(symbol)
+        return prices, stale
+    
+    async def _send_chunked(self, chat_id: int, parts: List[str], reply_markup=None, limit: int = MESSAGE_CHUNK_LIMIT):
+        """Send Markdown sections as few messages under Telegram's length limit; the keyboard goes on the last"""
+        chunks = []
+        current = []
+        size = 0
+        for part in parts:
+            # Split only between sections so no Markdown entity is cut in half
+            if current and size + len(part) > limit:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(part)
+            size += len(part)
+        chunks.append("".join(current))
+        
+        for i, chunk in enumerate(chunks):
+            markup = reply_markup if i == len(chunks) - 1 else None
+            await self._safe_send(self.bot.send_message, chat_id, chunk, parse_mode='Markdown', reply_markup=markup)
+    
+    async def _fetch_prices(self, symbols) -> Dict[str, Optional[float]]:
+        """Current prices for several symbols: fresh streamed ticks first, REST in parallel for the rest"""
+        prices, stale = self._streamed_prices(symbols)
+        if not stale:
+            return prices
+        
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(asyncio.wait_for(loop.run_in_executor(self._io_pool, self._cached,
+                                                    self.binance_client.get_current_price_sync, symbol),
+                               PRICE_FETCH_TIMEOUT)
+              for symbol in stale),
+            return_exceptions=True)
+        prices.update((symbol, None if isinstance(result, Exception) else result)
+                      for symbol, result in zip(stale, results))
+        return prices
+    
+    async def _run_command_once(self, handler, message):
+        """Run a command handler unless the same update is already being handled"""
+        key = (message.from_user.id, message.text, message.message_id)
+        if key in self._inflight:
+            return
+        self._inflight.add(key)
+        try:
+            await handler(message)
+        finally:
+            self._inflight.discard(key)
+    
+    def _check_authorization(self, user_id: int) -> bool:
+        """Check if user is authorized"""
+        # No authorized users set means everyone is allowed
+        return self._authorized is None or user_id in self._authorized
+    
+    async def handle_start_command(self, message):
+        """Handle /start command"""
+        user_id = message.from_user.id
+        
+        if not self._check_authorization(user_id):
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
+            return
+        
+        await self._safe_send(self.bot.send_message, message.chat.id, WELCOME_TEXT, parse_mode='Markdown', reply_markup=self._main_menu_kb)
+    
+    async def handle_help_command(self, message):
+        """Handle /help command"""
+        user_id = message.from_user.id
+        
+        if not self._check_authorization(user_id):
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
+            return
+        
+        await self._safe_send(self.bot.send_message, message.chat.id, HELP_TEXT, parse_mode='Markdown')
     
     async def handle_balance_command(self, message):
         """Handle /balance command"""
         user_id = message.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
             return
         
         try:
-            # Get balance from Binance (using sync methods)
-            usdt_balance = self.binance_client.get_usdt_balance_sync()
-            all_balances = self.binance_client.get_account_balance_sync()
-            
-            # Get open positions
-            positions = self.binance_client.get_open_positions_sync()
-            total_unrealized_pnl = sum(pos['unrealized_pnl'] for pos in positions)
+            # Get balances and open positions from Binance; the sync calls run concurrently off the loop
+            usdt_balance, all_balances, positions = await asyncio.gather(
+                self._cached_io(self.binance_client.get_usdt_balance_sync),
+                self._cached_io(self.binance_client.get_account_balance_sync),
+                self._cached_io(self.binance_client.get_open_positions_sync),
+            )
+            # Aggregate P&L and exposure in a single pass, vectorised for large books
+            if len(positions) >= SOA_MIN_POSITIONS:
+                columns = self.binance_client.positions_to_arrays(positions)
+                total_unrealized_pnl = float(columns['upnl'].sum())
+                total_notional = float(np.dot(np.abs(columns['amt']), columns['entry']))
+            else:
+                total_unrealized_pnl = 0.0
+                total_notional = 0.0
+                for pos in positions:
+                    total_unrealized_pnl += pos['unrealized_pnl']
+                    total_notional += abs(pos['position_amt']) * pos['entry_price']
             
             # Calculate total portfolio value
             total_value = usdt_balance + total_unrealized_pnl
             
             # Get risk metrics
-            risk_metrics = self.risk_manager.get_risk_metrics(usdt_balance, positions)
-            
-            balance_text = f"""
-💰 **Баланс рахунку**
-
-**Баланс USDT:** `{format_number(usdt_balance)} USDT`
-**Нереалізований P&L:** `{format_number(total_unrealized_pnl)} USDT`
-**Загальний портфель:** `{format_number(total_value)} USDT`
-
-**Метрики ризику:**
-• Доступний баланс: `{format_number(risk_metrics.available_balance)} USDT`
-• Загальна експозиція: `{format_number(risk_metrics.total_exposure)} USDT`
-• Поточна просадка: `{format_percentage(risk_metrics.current_drawdown)}%`
-• Щоденний P&L: `{format_number(risk_metrics.daily_pnl)} USDT`
-
-**Інші активи:**
-            """
+            risk_metrics = self.risk_manager.get_risk_metrics(usdt_balance, positions, total_notional=total_notional)
             
-            for asset, balance in all_balances.items():
-                if asset != 'USDT' and balance > 0:
-                    balance_text += f"• {asset}: `{format_number(balance)}`\n"
+            balance_text = BALANCE_TEMPLATE.format_map({
+                "usdt": format_number(usdt_balance),
+                "upnl": format_number(total_unrealized_pnl),
+                "total": format_number(total_value),
+                "available": format_number(risk_metrics.available_balance),
+                "exposure": format_number(risk_metrics.total_exposure),
+                "drawdown": format_percentage(risk_metrics.current_drawdown),
+                "daily_pnl": format_number(risk_metrics.daily_pnl),
+            })
             
-            # Add buttons
-            keyboard = types.InlineKeyboardMarkup(row_width=2)
-            keyboard.add(
-                types.InlineKeyboardButton("🔄 Оновити", callback_data="balance"),
-                types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
-            )
-            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+            balance_text += "".join(f"• {asset}: `{format_number(balance)}`\n"
+                                    for asset, balance in all_balances.items()
+                                    if asset != 'USDT' and balance > 0)
             
-            self.bot.send_message(message.chat.id, balance_text, parse_mode='Markdown', reply_markup=keyboard)
+            await self._safe_send(self.bot.send_message, message.chat.id, balance_text, parse_mode='Markdown', reply_markup=self._balance_kb)
             
         except Exception as e:
             logger.error(f"Error getting balance: {e}")
-            self.bot.reply_to(message, "❌ Помилка отримання інформації про баланс.")
+            await self._safe_send(self.bot.reply_to, message, "❌ Помилка отримання інформації про баланс.")
     
     async def handle_positions_command(self, message):
         """Handle /positions command"""
         user_id = message.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
             return
         
         try:
-            positions = self.binance_client.get_open_positions_sync()
+            positions = await self._cached_io(self.binance_client.get_open_positions_sync)
             
             if not positions:
-                positions_text = "📊 **Відкриті позиції**\n\nВідкриті позиції не знайдено."
+                parts = ["📊 **Відкриті позиції**\n\nВідкриті позиції не знайдено."]
             else:
-                positions_text = "📊 **Відкриті позиції**\n\n"
+                parts = ["📊 **Відкриті позиції**\n\n"]
+                # Streamed ticks first; one ticker request covers any the stream has not priced lately
+                all_prices, stale = self._streamed_prices(pos['symbol'] for pos in positions)
+                if stale:
+                    all_prices = {**await self._cached_io(self.binance_client.get_all_prices_sync), **all_prices}
                 
                 for pos in positions:
                     symbol = pos['symbol']
@@ -293,7 +745,7 @@ class TradingBot:
                     unrealized_pnl = pos['unrealized_pnl']
                     
                     # Get current price
-                    current_price = self.binance_client.get_current_price_sync(symbol)
+                    current_price = all_prices.get(symbol)
                     current_price_str = f"{format_number(current_price)}" if current_price else "N/A"
                     
                     # Calculate percentage manually if testnet doesn't provide it
@@ -307,46 +759,35 @@ class TradingBot:
                     pnl_emoji = "🟢" if unrealized_pnl >= 0 else "🔴"
                     side_emoji = "🟢" if side == "LONG" else "🔴"
                     
-                    positions_text += f"""
+                    parts.append(f"""
 {side_emoji} **{symbol}** ({side})
 • Розмір: `{format_number(size)}`
 • Вхід: `{format_number(entry_price)} USDT`
 • Поточна: `{current_price_str} USDT`
 • P&L: `{format_number(unrealized_pnl)} USDT` ({format_percentage(percentage)}%) {pnl_emoji}
-                    """
+                    """)
             
-            # Add buttons
-            keyboard = types.InlineKeyboardMarkup(row_width=2)
-            keyboard.add(
-                types.InlineKeyboardButton("🔄 Оновити", callback_data="positions"),
-                types.InlineKeyboardButton("💰 Баланс", callback_data="balance")
-            )
-            keyboard.add(
-                types.InlineKeyboardButton("🛑 Закрити все", callback_data="close_all_positions"),
-                types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu")
-            )
-            
-            self.bot.send_message(message.chat.id, positions_text, parse_mode='Markdown', reply_markup=keyboard)
+            await self._send_chunked(message.chat.id, parts, reply_markup=self._positions_kb)
             
         except Exception as e:
             logger.error(f"Error getting positions: {e}")
-            self.bot.reply_to(message, "❌ Помилка отримання інформації про позиції.")
+            await self._safe_send(self.bot.reply_to, message, "❌ Помилка отримання інформації про позиції.")
     
     async def handle_trades_command(self, message):
         """Handle /trades command"""
         user_id = message.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
             return
         
         try:
             recent_trades = self.data_storage.get_recent_trades(days=7)
             
             if not recent_trades:
-                trades_text = "📝 **Останні торги (7 днів)**\n\nТоргів за останні 7 днів не знайдено."
+                parts = ["📝 **Останні торги (7 днів)**\n\nТоргів за останні 7 днів не знайдено."]
             else:
-                trades_text = "📝 **Останні торги (7 днів)**\n\n"
+                parts = ["📝 **Останні торги (7 днів)**\n\n"]
                 
                 for trade in recent_trades[:10]:  # Show last 10 trades
                     symbol = trade.get('symbol', 'N/A')
@@ -357,51 +798,40 @@ class TradingBot:
                     status = trade.get('status', 'open')
                     timestamp = trade.get('timestamp', '')
                     
-                    # Format timestamp
-                    try:
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(timestamp)
-                        time_str = dt.strftime("%m/%d %H:%M")
-                    except:
-                        time_str = "N/A"
+                    time_str = _format_trade_time(timestamp)
                     
                     pnl_emoji = "🟢" if pnl >= 0 else "🔴"
                     status_emoji = "✅" if status == "closed" else "⏳"
                     
-                    trades_text += f"""
+                    parts.append(f"""
 {status_emoji} **{symbol}** - {side}
 • Час: `{time_str}`
 • Кількість: `{format_number(quantity)}`
-• Ціна: `{format_number(price)} USDT`
-• P&L: `{format_number(pnl)} USDT` {pnl_emoji}
-• Статус: `{status.upper()}`
-                    """
-            
-            # Add buttons
-            keyboard = types.InlineKeyboardMarkup(row_width=2)
-            keyboard.add(
-                types.InlineKeyboardButton("📊 Статистика", callback_data="stats"),
-                types.InlineKeyboardButton("💰 Баланс", callback_data="balance")
-            )
-            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+• Ціна: `{format_number(price)} USDT`
+• P&L: `{format_number(pnl)} USDT` {pnl_emoji}
+• Статус: `{status.upper()}`
+                    """)
             
-            self.bot.send_message(message.chat.id, trades_text, parse_mode='Markdown', reply_markup=keyboard)
+            await self._send_chunked(message.chat.id, parts, reply_markup=self._trades_kb)
             
         except Exception as e:
             logger.error(f"Error getting trades: {e}")
-            self.bot.reply_to(message, "❌ Помилка отримання історії торгів.")
+            await self._safe_send(self.bot.reply_to, message, "❌ Помилка отримання історії торгів.")
     
     async def handle_stats_command(self, message):
         """Handle /stats command"""
         user_id = message.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
             return
         
         try:
+            # Price every open trade's symbol once, in parallel, for both the totals and the weekly figures
+            open_prices = await self._fetch_prices({trade['symbol'] for trade in self.data_storage.get_trades(status="open")})
+            
             # Get current stats including open positions P&L
-            current_stats = self.data_storage.calculate_current_pnl_with_positions(self.binance_client)
+            current_stats = self.data_storage.calculate_current_pnl_with_positions(open_prices)
             
             total_trades = current_stats.get('total_trades', 0)
             winning_trades = current_stats.get('winning_trades', 0)
@@ -414,277 +844,174 @@ class TradingBot:
             
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
             
-            # Get recent performance - calculate with current prices for open trades
-            recent_trades = self.data_storage.get_recent_trades(days=1)
-            daily_trades = len(recent_trades)
-            daily_pnl = 0.0
-            
-            # Calculate daily P&L including current open positions
-            for trade in recent_trades:
-                if trade.get('status') == 'closed':
-                    daily_pnl += trade.get('pnl', 0)
-                elif trade.get('status') == 'open':
-                    # Calculate current P&L for open trade
-                    try:
-                        from utils import calculate_pnl
-                        current_price = self.binance_client.get_current_price_sync(trade['symbol'])
-                        if current_price:
-                            pnl = calculate_pnl(trade['price'], current_price, trade['quantity'], trade['side'])
-                            daily_pnl += pnl
-                    except:
-                        pass
-            
+            # Get recent performance in one pass over the week; the last day is a subset of it
             weekly_trades = self.data_storage.get_recent_trades(days=7)
+            day_cutoff = datetime.now() - timedelta(days=1)
+            daily_trades = 0
+            daily_pnl = 0.0
             weekly_pnl = 0.0
-            
-            # Calculate weekly P&L including current open positions
             for trade in weekly_trades:
-                if trade.get('status') == 'closed':
-                    weekly_pnl += trade.get('pnl', 0)
-                elif trade.get('status') == 'open':
+                status = trade.get('status')
+                if status == 'closed':
+                    pnl = trade.get('pnl', 0)
+                elif status == 'open':
                     # Calculate current P&L for open trade
+                    pnl = 0.0
                     try:
-                        from utils import calculate_pnl
-                        current_price = self.binance_client.get_current_price_sync(trade['symbol'])
+                        current_price = open_prices.get(trade['symbol'])
                         if current_price:
                             pnl = calculate_pnl(trade['price'], current_price, trade['quantity'], trade['side'])
-                            weekly_pnl += pnl
-                    except:
+                    except Exception:
                         pass
+                else:
+                    pnl = 0.0
+                
+                weekly_pnl += pnl
+                if datetime.fromisoformat(trade['timestamp']) >= day_cutoff:
+                    daily_trades += 1
+                    daily_pnl += pnl
             
-            current_balance = self.binance_client.get_usdt_balance_sync()
+            current_balance = await self._cached_io(self.binance_client.get_usdt_balance_sync)
             risk_reducing = self.risk_manager.should_reduce_risk(current_balance)
             
-            stats_text = f"""
-📈 **Статистика торгівлі**
-
-**Загальна продуктивність:**
-• Всього торгів: `{total_trades}`
-• Прибуткові торги: `{winning_trades}`
-• Збиткові торги: `{losing_trades}`
-• Відсоток виграшів: `{format_percentage(win_rate)}%`
-• Загальний P&L: `{format_number(total_pnl)} USDT`
-
-**Детальний P&L:**
-• Реалізований P&L: `{format_number(realized_pnl)} USDT` (закриті торги: {closed_trades})
-• Нереалізований P&L: `{format_number(unrealized_pnl)} USDT` (відкриті позиції: {open_positions})
-
-**Недавня продуктивність:**
-• Торгів за день: `{daily_trades}`
-• Денний P&L: `{format_number(daily_pnl)} USDT`
-• Тижневий P&L: `{format_number(weekly_pnl)} USDT`
-
-**Статус бота:**
-• Торгівля активна: `{'✅ Так' if self.is_trading_active else '❌ Ні'}`
-• Відстежувані символи: `{len(self.monitoring_symbols)}`
-• Рівень ризику: `{'🟢 Низький' if not risk_reducing else '🔴 Високий'}`
-            """
-            
-            # Add buttons
-            keyboard = types.InlineKeyboardMarkup(row_width=2)
-            keyboard.add(
-                types.InlineKeyboardButton("📝 Останні торги", callback_data="trades"),
-                types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
-            )
-            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
-            
-            self.bot.send_message(message.chat.id, stats_text, parse_mode='Markdown', reply_markup=keyboard)
+            stats_text = STATS_TEMPLATE.format_map({
+                "total_trades": total_trades,
+                "winning_trades": winning_trades,
+                "losing_trades": losing_trades,
+                "win_rate": format_percentage(win_rate),
+                "total_pnl": format_number(total_pnl),
+                "realized_pnl": format_number(realized_pnl),
+                "closed_trades": closed_trades,
+                "unrealized_pnl": format_number(unrealized_pnl),
+                "open_positions": open_positions,
+                "daily_trades": daily_trades,
+                "daily_pnl": format_number(daily_pnl),
+                "weekly_pnl": format_number(weekly_pnl),
+                "trading_active": '✅ Так' if self.is_trading_active else '❌ Ні',
+                "symbols_count": self._monitoring_len,
+                "risk_level": '🟢 Низький' if not risk_reducing else '🔴 Високий',
+            })
+            
+            await self._safe_send(self.bot.send_message, message.chat.id, stats_text, parse_mode='Markdown', reply_markup=self._stats_kb)
             
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
-            self.bot.reply_to(message, "❌ Помилка отримання статистики.")
+            await self._safe_send(self.bot.reply_to, message, "❌ Помилка отримання статистики.")
     
-    def handle_settings_command(self, message):
+    async def handle_settings_command(self, message):
         """Handle /settings command"""
         user_id = message.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.reply_to(message, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.reply_to, message, UNAUTHORIZED_TEXT)
             return
         
         try:
-            settings_text = f"""
-        ⚙️ **Налаштування Бота**
-
-        **Ризик-менеджмент:**
-        • Сума за замовчуванням: `{format_number(self.config.DEFAULT_TRADE_AMOUNT)} USDT`
-        • Максимальний розмір позиції: `{format_number(self.config.MAX_POSITION_SIZE)} USDT`
-        • Стоп-лосс: `{self.config.STOP_LOSS_PERCENT}%`
-        • Тейк-профіт: `{self.config.TAKE_PROFIT_PERCENT}%`
-        • Максимальна просадка: `{self.config.MAX_DRAWDOWN_PERCENT}%`
-
-        **Параметри Стратегії:**
-        • Період Тренду: `{self.config.TREND_PERIOD}`
-        • Період RSI: `{self.config.RSI_PERIOD}`
-        • RSI Перепроданий: `{self.config.RSI_OVERSOLD}`
-        • RSI Перекуплений: `{self.config.RSI_OVERBOUGHT}`
-
-        **Система:**
-        • Режим Тестнет: `{'✅ Так' if self.config.BINANCE_TESTNET else '❌ Ні'}`
-        • Моніторинг Парами: `{len(self.monitoring_symbols)}`
-        • Авто Торгівля: `{'✅ Активна' if self.is_trading_active else '❌ Неактивна'}`
-            """
-            
-            # Додаємо кнопки
-            keyboard = types.InlineKeyboardMarkup(row_width=2)
-            keyboard.add(
-                types.InlineKeyboardButton("🔧 Змінити Налаштування", callback_data="modify_settings"),
-                types.InlineKeyboardButton("📋 Переглянути Пари", callback_data="view_pairs")
+            settings_text = self._settings_template.format(
+                symbols_count=self._monitoring_len,
+                trading_active='✅ Активна' if self.is_trading_active else '❌ Неактивна',
             )
-            keyboard.add(
-                types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"),
-                types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading")
-            )
-            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
             
-            self.bot.send_message(message.chat.id, settings_text, parse_mode='Markdown', reply_markup=keyboard)
+            await self._safe_send(self.bot.send_message, message.chat.id, settings_text, parse_mode='Markdown', reply_markup=self._settings_kb)
             
         except Exception as e:
             logger.error(f"Error getting settings: {e}")
-            self.bot.reply_to(message, "❌ Помилка отримання налаштувань.")
+            await self._safe_send(self.bot.reply_to, message, "❌ Помилка отримання налаштувань.")
     
     async def handle_callback_query(self, call):
         """Handle callback queries from inline keyboards"""
         user_id = call.from_user.id
         
         if not self._check_authorization(user_id):
-            self.bot.answer_callback_query(call.id, "❌ Ви не авторизовані для використання цього бота.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, UNAUTHORIZED_TEXT)
+            return
+        
+        # Drop double-clicks / duplicate updates while the same callback is still running
+        inflight_key = (user_id, call.data)
+        if inflight_key in self._inflight:
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             return
+        self._inflight.add(inflight_key)
         
         try:
-            if call.data == "balance":
-                await self.handle_balance_callback(call)
-            elif call.data == "positions":
-                await self.handle_positions_callback(call)
-            elif call.data == "trades":
-                await self.handle_trades_callback(call)
-            elif call.data == "stats":
-                await self.handle_stats_callback(call)
-            elif call.data == "settings":
-                await self.handle_settings_callback(call)
-            elif call.data == "start_trading":
-                await self.handle_start_trading_callback(call)
-            elif call.data == "stop_trading":
-                await self.handle_stop_trading_callback(call)
-            elif call.data == "close_all_positions":
-                await self.handle_close_all_positions_callback(call)
-            elif call.data == "main_menu":
-                await self.handle_main_menu_callback(call)
-            elif call.data == "view_pairs":
-                await self.handle_view_pairs_callback(call)
-            elif call.data.startswith("pairs_page_"):
-                await self.handle_pairs_page_callback(call)
-            elif call.data.startswith("toggle_pair_"):
-                await self.handle_toggle_pair_callback(call)
-            elif call.data == "search_pairs":
-                await self.handle_search_pairs_callback(call)
-            elif call.data == "clear_search":
-                await self.handle_clear_search_callback(call)
-            elif call.data == "modify_settings":
-                await self.handle_modify_settings_callback(call)
-            elif call.data == "apply_pairs":
-                await self.handle_apply_pairs_callback(call)
-            elif call.data == "reset_pairs":
-                await self.handle_reset_pairs_callback(call)
+            handler = self._callback_routes.get(call.data)
+            if handler is None:
+                handler = next((prefix_handler for prefix, prefix_handler in self._callback_prefixes
+                                if call.data.startswith(prefix)), None)
+            if handler is not None:
+                await handler(call)
             else:
-                self.bot.answer_callback_query(call.id, "❌ Невідома команда.")
+                await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Невідома команда.")
                 
         except Exception as e:
             logger.error(f"Error handling callback {call.data}: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка обробки запиту.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка обробки запиту.")
+        finally:
+            self._inflight.discard(inflight_key)
     
     async def handle_balance_callback(self, call):
         """Handle balance callback"""
-        # Create a message object from callback query
-        class FakeMessage:
-            def __init__(self, chat_id, from_user):
-                self.chat = type('', (), {'id': chat_id})()
-                self.from_user = from_user
-        
-        fake_message = FakeMessage(call.message.chat.id, call.from_user)
-        await self.handle_balance_command(fake_message)
-        self.bot.answer_callback_query(call.id)
+        await self.handle_balance_command(_FakeMsg.from_call(call))
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_positions_callback(self, call):
         """Handle positions callback"""
-        class FakeMessage:
-            def __init__(self, chat_id, from_user):
-                self.chat = type('', (), {'id': chat_id})()
-                self.from_user = from_user
-        
-        fake_message = FakeMessage(call.message.chat.id, call.from_user)
-        await self.handle_positions_command(fake_message)
-        self.bot.answer_callback_query(call.id)
+        await self.handle_positions_command(_FakeMsg.from_call(call))
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_trades_callback(self, call):
         """Handle trades callback"""
-        class FakeMessage:
-            def __init__(self, chat_id, from_user):
-                self.chat = type('', (), {'id': chat_id})()
-                self.from_user = from_user
-        
-        fake_message = FakeMessage(call.message.chat.id, call.from_user)
-        await self.handle_trades_command(fake_message)
-        self.bot.answer_callback_query(call.id)
+        await self.handle_trades_command(_FakeMsg.from_call(call))
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_stats_callback(self, call):
         """Handle stats callback"""
-        class FakeMessage:
-            def __init__(self, chat_id, from_user):
-                self.chat = type('', (), {'id': chat_id})()
-                self.from_user = from_user
-        
-        fake_message = FakeMessage(call.message.chat.id, call.from_user)
-        await self.handle_stats_command(fake_message)
-        self.bot.answer_callback_query(call.id)
+        await self.handle_stats_command(_FakeMsg.from_call(call))
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_settings_callback(self, call):
         """Handle settings callback"""
-        class FakeMessage:
-            def __init__(self, chat_id, from_user):
-                self.chat = type('', (), {'id': chat_id})()
-                self.from_user = from_user
-        
-        fake_message = FakeMessage(call.message.chat.id, call.from_user)
-        self.handle_settings_command(fake_message)
-        self.bot.answer_callback_query(call.id)
+        await self.handle_settings_command(_FakeMsg.from_call(call))
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_start_trading_callback(self, call):
         """Handle start trading callback"""
         if self.is_trading_active:
-            self.bot.edit_message_text("✅ Торгівля вже активна!", call.message.chat.id, call.message.message_id)
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.edit_message_text, "✅ Торгівля вже активна!", call.message.chat.id, call.message.message_id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             return
         
-        self.is_trading_active = True
+        self._trading_event.set()
+        self._rest_cache.clear()
         
-        # Start the trading loop in a separate thread
-        threading.Thread(target=self._start_trading_loop, daemon=True).start()
+        # Run the trading loop as a task on the bot's event loop; a paused loop just resumes
+        if self._trading_task is None or self._trading_task.done():
+            self._trading_task = asyncio.create_task(self.trading_loop())
         
         # Enhanced notification about trading start
         start_msg = f"""🚀 **Автоматична торгівля запущена!**
 
-**Пари для моніторингу:** {len(self.monitoring_symbols)}
-• {', '.join(self.monitoring_symbols[:3])}{'...' if len(self.monitoring_symbols) > 3 else ''}
+**Пари для моніторингу:** {self._monitoring_len}
+• {self._monitoring_preview}
 
 🔍 Пошук торгових сигналів кожну хвилину...
 📊 Отримаєте повідомлення про кожну операцію
 """
         
-        self.bot.edit_message_text(start_msg, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
-        self.bot.answer_callback_query(call.id, "🚀 Торгівля запущена!")
+        await self._safe_send(self.bot.edit_message_text, start_msg, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
+        await self._safe_send(self.bot.answer_callback_query, call.id, "🚀 Торгівля запущена!")
     
     async def handle_stop_trading_callback(self, call):
         """Handle stop trading callback"""
         if not self.is_trading_active:
-            self.bot.edit_message_text("⏸ Торгівля вже зупинена!", call.message.chat.id, call.message.message_id)
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.edit_message_text, "⏸ Торгівля вже зупинена!", call.message.chat.id, call.message.message_id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             return
         
-        self.is_trading_active = False
-        self.bot.edit_message_text("⏸ Автоматична торгівля зупинена!\n\nБот більше не виконуватиме нові торги, але існуючі позиції залишаються відкритими.", 
+        self._trading_event.clear()
+        await self._safe_send(self.bot.edit_message_text, "⏸ Автоматична торгівля зупинена!\n\nБот більше не виконуватиме нові торги, але існуючі позиції залишаються відкритими.", 
                                   call.message.chat.id, call.message.message_id)
-        self.bot.answer_callback_query(call.id)
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def handle_close_all_positions_callback(self, call):
         """Handle close all positions callback"""
@@ -692,143 +1019,214 @@ class TradingBot:
             positions = await self.binance_client.get_open_positions()
             
             if not positions:
-                self.bot.edit_message_text("Немає відкритих позицій для закриття.", call.message.chat.id, call.message.message_id)
-                self.bot.answer_callback_query(call.id)
+                await self._safe_send(self.bot.edit_message_text, "Немає відкритих позицій для закриття.", call.message.chat.id, call.message.message_id)
+                await self._safe_send(self.bot.answer_callback_query, call.id)
                 return
             
-            closed_count = 0
-            for position in positions:
-                symbol = position['symbol']
-                side = 'SELL' if position['side'] == 'LONG' else 'BUY'
-                quantity = abs(position['position_amt'])
-                
-                # Place market order to close position
-                order = await self.binance_client.place_market_order(symbol, side, quantity)
-                if order:
-                    closed_count += 1
-                    
-                    # Save trade record
-                    current_price = await self.binance_client.get_current_price(symbol)
-                    if current_price:
-                        pnl = calculate_pnl(position['entry_price'], current_price, quantity, position['side'])
-                    else:
-                        pnl = 0.0
-                    
-                    trade_data = {
-                        'symbol': symbol,
-                        'side': side,
-                        'quantity': quantity,
-                        'price': current_price,
-                        'pnl': pnl,
-                        'status': 'closed',
-                        'order_id': order.get('orderId', ''),
-                        'type': 'market_close'
-                    }
-                    
-                    self.data_storage.save_trade(trade_data)
+            # Cached balances and positions are about to go stale
+            self._rest_cache.clear()
+            # Price every symbol up front, then close every position concurrently; each close is independent
+            prices = await self._fetch_prices(position['symbol'] for position in positions)
+            results = await asyncio.gather(*(self._close_one(position, prices.get(position['symbol']))
+                                             for position in positions),
+                                           return_exceptions=True)
+            closed_count = sum(1 for result in results if result is True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Error closing position: {result}")
             
             message = f"✅ Закрито {closed_count} з {len(positions)} позицій."
-            self.bot.edit_message_text(message, call.message.chat.id, call.message.message_id)
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.edit_message_text, message, call.message.chat.id, call.message.message_id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             
         except Exception as e:
             logger.error(f"Error closing positions: {e}")
-            self.bot.edit_message_text("❌ Помилка закриття позицій.", call.message.chat.id, call.message.message_id)
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.edit_message_text, "❌ Помилка закриття позицій.", call.message.chat.id, call.message.message_id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
     
-    async def handle_main_menu_callback(self, call):
-        """Handle main menu callback"""
-        # Recreate the main menu
-        welcome_text = """
-🚀 **Торговий бот Binance Futures**
-
-З поверненням! Використовуйте кнопки нижче для швидкої навігації:
-        """
+    async def _close_one(self, position: Dict, current_price: Optional[float]) -> bool:
+        """Close one position with a market order and record the trade at current_price"""
+        symbol = position['symbol']
+        side = 'SELL' if position['side'] == 'LONG' else 'BUY'
+        quantity = abs(position['position_amt'])
         
-        keyboard = types.InlineKeyboardMarkup(row_width=2)
-        keyboard.add(
-            types.InlineKeyboardButton("💰 Баланс", callback_data="balance"),
-            types.InlineKeyboardButton("📊 Позиції", callback_data="positions")
-        )
-        keyboard.add(
-            types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"),
-            types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading")
-        )
-        keyboard.add(
-            types.InlineKeyboardButton("📈 Статистика", callback_data="stats"),
-            types.InlineKeyboardButton("⚙️ Налаштування", callback_data="settings")
-        )
+        # Place market order to close position
+        order = await self.binance_client.place_market_order(symbol, side, quantity)
+        if not order:
+            return False
+        
+        # Save trade record
+        if current_price:
+            pnl = calculate_pnl(position['entry_price'], current_price, quantity, position['side'])
+        else:
+            pnl = 0.0
         
-        self.bot.edit_message_text(welcome_text, call.message.chat.id, call.message.message_id, 
-                                  parse_mode='Markdown', reply_markup=keyboard)
-        self.bot.answer_callback_query(call.id)
+        trade_data = {
+            'symbol': symbol,
+            'side': side,
+            'quantity': quantity,
+            'price': current_price,
+            'pnl': pnl,
+            'status': 'closed',
+            'order_id': order.get('orderId', ''),
+            'type': 'market_close'
+        }
+        
+        self._trade_write_q.put_nowait(trade_data)
+        return True
+    
+    async def _trade_writer(self):
+        """Persist queued trade records, one file write per batch"""
+        while True:
+            batch = [await self._trade_write_q.get()]
+            while not self._trade_write_q.empty():
+                batch.append(self._trade_write_q.get_nowait())
+            self.data_storage.save_trades_batch(batch)
+    
+    def _save_user_settings_later(self, user_id: int, settings: Dict):
+        """Store user settings in memory; _settings_flusher writes them to disk"""
+        self.data_storage.set_user_settings(user_id, settings)
+        self._dirty_users.add(user_id)
+    
+    async def _flush_user_settings(self):
+        """Write pending user settings, encoding on the loop and writing on a thread"""
+        async with self._settings_lock:
+            await self._write_dirty_settings()
+    
+    async def _reload_data(self):
+        """Reload the data file once pending settings are on disk, so the reload cannot roll them back"""
+        async with self._settings_lock:
+            # Write and reload with no await in between: a toggle applied during an await would be
+            # marked dirty but then overwritten in memory by the older file
+            if self._dirty_users:
+                users = len(self._dirty_users)
+                try:
+                    self.data_storage.write_serialized(self.data_storage.serialize())
+                except Exception as e:
+                    # Reloading now would drop the unsaved settings; the flusher retries them
+                    logger.error(f"Error saving user settings before reload: {e}")
+                    return
+                self._dirty_users.clear()
+                logger.info(f"User settings saved for {users} user(s)")
+            self.data_storage.reload_data()
+    
+    async def _write_dirty_settings(self):
+        """Write the data file if any user's settings changed; caller holds _settings_lock"""
+        if not self._dirty_users:
+            return
+        users = len(self._dirty_users)
+        self._dirty_users.clear()
+        # Serialize here so the worker thread never reads data the loop is mutating
+        snapshot = self.data_storage.serialize()
+        try:
+            await asyncio.to_thread(self.data_storage.write_serialized, snapshot)
+            logger.info(f"User settings saved for {users} user(s)")
+        except Exception as e:
+            logger.error(f"Error saving user settings: {e}")
+    
+    async def _settings_flusher(self):
+        """Periodically persist user settings changed by callbacks"""
+        while True:
+            await asyncio.sleep(SETTINGS_FLUSH_INTERVAL)
+            await self._flush_user_settings()
     
-    def _start_trading_loop(self):
-        """Start the trading loop in a separate thread"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self.trading_loop())
+    async def handle_main_menu_callback(self, call):
+        """Handle main menu callback"""
+        await self._safe_send(self.bot.edit_message_text, MAIN_MENU_TEXT, call.message.chat.id, call.message.message_id, 
+                                  parse_mode='Markdown', reply_markup=self._main_menu_kb)
+        await self._safe_send(self.bot.answer_callback_query, call.id)
     
     async def trading_loop(self):
         """Main trading loop"""
         logger.info("Trading loop started")
+        error_count = 0
         
-        while self.is_trading_active:
-            try:
-                # Reload data from file and check for user settings updates before each scan
-                self.data_storage.reload_data()
-                user_data = self.data_storage.data.get("user_settings", {})
-                logger.info(f"🔍 Loaded user data: {user_data}")
+        try:
+            while True:
+                # Park here while trading is stopped instead of polling a flag
+                await self._trading_event.wait()
+                try:
+                    # Reload data from file and check for user settings updates before each scan
+                    await self._reload_data()
+                    user_data = self.data_storage.data.get("user_settings", {})
+                    logger.info(f"🔍 Loaded user data: {user_data}")
                 
-                if user_data:
-                    # Get the first user's settings (since we have only one user configured)
-                    first_user_id = next(iter(user_data.keys()))
-                    user_settings = user_data[first_user_id]
-                    selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
+                    if user_data:
+                        # Get the first user's settings (since we have only one user configured)
+                        first_user_id = next(iter(user_data.keys()))
+                        user_settings = user_data[first_user_id]
+                        selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
                     
-                    if selected_pairs and selected_pairs != self.monitoring_symbols:
-                        logger.info(f"🔄 User settings changed: {self.monitoring_symbols} -> {selected_pairs}")
-                        self.monitoring_symbols = selected_pairs.copy()
-                        # Restart WebSocket handler with new symbols
-                        try:
-                            self.websocket_handler.stop()
-                            self.websocket_handler.start(self.monitoring_symbols)
+                        if selected_pairs and selected_pairs != self.monitoring_symbols:
+                            logger.info(f"🔄 User settings changed: {self.monitoring_symbols} -> {selected_pairs}")
+                            self.monitoring_symbols = selected_pairs
+                            # The ticker stream covers every symbol; only the filter changes
+                            self.websocket_handler.set_symbols(self.monitoring_symbols)
                             logger.info(f"✅ Updated monitoring to {len(self.monitoring_symbols)} symbols")
-                        except Exception as ws_error:
-                            logger.warning(f"WebSocket restart warning: {ws_error}")
-                    else:
-                        logger.info(f"⚡ No changes in user settings detected")
+                        else:
+                            logger.info(f"⚡ No changes in user settings detected")
                 
-                logger.info(f"🔍 Scanning {len(self.monitoring_symbols)} symbols for trading opportunities...")
+                    logger.info(f"🔍 Scanning {len(self.monitoring_symbols)} symbols for trading opportunities...")
                 
-                # Monitor closed positions and cancel corresponding orders
-                await self.check_and_cancel_orphaned_orders()
+                    # Monitor closed positions and cancel corresponding orders
+                    await self.check_and_cancel_orphaned_orders()
                 
-                # Scan for opportunities
-                signals = await self.strategy.scan_opportunities(self.monitoring_symbols)
+                    # Scan for opportunities
+                    signals = await self.strategy.scan_opportunities(self.monitoring_symbols)
                 
-                if signals:
-                    logger.info(f"🎯 Found {len(signals)} trading signals: {[f'{s.symbol}-{s.signal_type.value}' for s in signals[:3]]}")
-                    for signal in signals:
-                        logger.info(f"  📈 {signal.symbol}: {signal.signal_type.value} (confidence: {signal.confidence:.1%}) - {signal.reason}")
-                else:
-                    logger.info(f"⏸️ No trading signals found across {len(self.monitoring_symbols)} symbols")
+                    if signals:
+                        logger.info(f"🎯 Found {len(signals)} trading signals: {[f'{s.symbol}-{s.signal_type.value}' for s in signals[:3]]}")
+                        for signal in signals:
+                            logger.info(f"  📈 {signal.symbol}: {signal.signal_type.value} (confidence: {signal.confidence:.1%}) - {signal.reason}")
+                    else:
+                        logger.info(f"⏸️ No trading signals found across {len(self.monitoring_symbols)} symbols")
                 
-                for signal in signals:
-                    if not self.is_trading_active:
-                        break
-                    
-                    logger.info(f"🔄 Processing signal for {signal.symbol}...")
-                    await self.process_trading_signal(signal)
+                    await self._process_signals(signals)
                 
-                # Wait before next scan
-                await asyncio.sleep(60)  # Check every minute
+                    error_count = 0
+                    # Rescan when a monitored price moves, or after SCAN_INTERVAL at the latest
+                    await self._wait_for_next_scan()
                 
-            except Exception as e:
-                logger.error(f"Error in trading loop: {e}")
-                await asyncio.sleep(30)  # Wait 30 seconds on error
-        
-        logger.info("Trading loop stopped")
+                except TRADING_BUG_ERRORS:
+                    # A bug will not go away by retrying; stop trading and surface it
+                    self._trading_event.clear()
+                    logger.exception("❌ Trading loop crashed, trading stopped")
+                    await self._notify_all("❌ **Торгівлю зупинено через внутрішню помилку.** Перевірте логи.", "crash")
+                    raise
+                except Exception as e:
+                    error_count += 1
+                    delay = self._trading_retry_delay(e, error_count)
+                    logger.error(f"Error in trading loop: {e} (retry in {delay:.0f}s)")
+                    await asyncio.sleep(delay)
+        finally:
+            logger.info("Trading loop stopped")
+    
+    @staticmethod
+    def _trading_retry_delay(error: Exception, error_count: int) -> float:
+        """Backoff after a failed scan: Binance's Retry-After if given, else jittered 2s doubling up to the cap"""
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = min(TRADING_MAX_BACKOFF, 2 ** error_count)
+        # Jitter keeps several bot instances from retrying in lockstep during an outage
+        return delay + random.uniform(0, delay * 0.5)
+    
+    async def _wait_for_next_scan(self):
+        """Sleep until a monitored price moves past the wake threshold or the scan interval passes"""
+        price_updated = self.websocket_handler.price_updated
+        # Moves seen during the scan that just finished already count
+        await asyncio.sleep(self.config.MIN_SCAN_INTERVAL)
+        try:
+            await asyncio.wait_for(price_updated.wait(),
+                                   timeout=max(self.config.SCAN_INTERVAL - self.config.MIN_SCAN_INTERVAL, 0))
+            logger.info("📈 Price move detected, rescanning early")
+        except asyncio.TimeoutError:
+            pass
+        price_updated.clear()
     
     async def handle_position_close(self, signal):
         """Handle closing an existing position due to take profit or stop loss"""
@@ -860,7 +1258,7 @@ class TradingBot:
             logger.info(f"📋 Position details: {position_side} {position_size} {symbol} @ {entry_price}")
             
             # Get current market price
-            current_price = self.binance_client.get_current_price_sync(symbol)
+            current_price = (await self._fetch_prices([symbol])).get(symbol)
             if not current_price:
                 logger.error(f"❌ Could not get current price for {symbol}")
                 return
@@ -872,9 +1270,11 @@ class TradingBot:
             logger.info(f"💰 Expected PnL: {expected_pnl:.2f} USDT (entry: {entry_price}, current: {current_price})")
             
             # Place market order to close position
-            close_order = self.binance_client.place_market_order_sync(symbol, close_side, position_size)
+            close_order = await self._run_io(self.binance_client.place_market_order_sync, symbol, close_side, position_size)
             
             if close_order:
+                # Margin was just released - the cached balance is stale now
+                self._rest_cache.clear()
                 # Get actual fill price from order
                 fill_price = float(close_order.get('avgPrice', current_price))
                 actual_pnl = calculate_pnl(entry_price, fill_price, position_size, position_side)
@@ -896,7 +1296,7 @@ class TradingBot:
                     'reason': signal.reason
                 }
                 
-                self.data_storage.save_trade(trade_data)
+                self._trade_write_q.put_nowait(trade_data)
                 
                 # Remove from active positions cache in trading strategy
                 self.strategy.remove_position(symbol)
@@ -917,22 +1317,21 @@ class TradingBot:
     async def cancel_related_orders(self, symbol):
         """Cancel stop-loss and take-profit orders for a symbol"""
         try:
-            active_orders = self.data_storage.get_active_orders()
-            if symbol in active_orders:
-                orders = active_orders[symbol]
+            orders = self.data_storage.get_active_orders(symbol)
+            if orders:
                 cancelled_orders = []
                 
                 # Cancel stop-loss order if exists
                 if 'stop_loss' in orders:
                     stop_order_id = orders['stop_loss']
-                    if self.binance_client.cancel_order_sync(symbol, stop_order_id):
+                    if await self._run_io(self.binance_client.cancel_order_sync, symbol, stop_order_id):
                         cancelled_orders.append("stop-loss")
                         logger.info(f"✅ Cancelled stop-loss order {stop_order_id} for {symbol}")
                     
                 # Cancel take-profit order if exists
                 if 'take_profit' in orders:
                     tp_order_id = orders['take_profit']
-                    if self.binance_client.cancel_order_sync(symbol, tp_order_id):
+                    if await self._run_io(self.binance_client.cancel_order_sync, symbol, tp_order_id):
                         cancelled_orders.append("take-profit")
                         logger.info(f"✅ Cancelled take-profit order {tp_order_id} for {symbol}")
                 
@@ -962,16 +1361,65 @@ class TradingBot:
 **P&L:** {pnl_text} USDT ({pnl_percent:+.2f}%)
 **Причина:** {reason}"""
                 
-            user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-            for user_id in user_ids:
-                try:
-                    self.bot.send_message(user_id, close_msg, parse_mode='Markdown')
-                except Exception as e:
-                    logger.error(f"Failed to send close notification to {user_id}: {e}")
+            await self._notify_all(close_msg, "close")
                     
         except Exception as e:
             logger.error(f"Error sending position close notification: {e}")
     
+    async def _notify_all(self, text: str, kind: str):
+        """Send a Markdown notification to every authorized user concurrently"""
+        results = await asyncio.gather(
+            *(self._safe_send(self.bot.send_message, user_id, text, parse_mode='Markdown')
+              for user_id in self._notify_user_ids),
+            return_exceptions=True
+        )
+        for user_id, result in zip(self._notify_user_ids, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to send {kind} notification to {user_id}: {result}")
+    
+    @staticmethod
+    def _is_position_close_signal(signal) -> bool:
+        """Whether a signal is a take-profit / stop-loss exit rather than a new entry"""
+        reason = signal.reason.lower()
+        return signal.signal_type == SignalType.SELL and any(
+            marker in reason for marker in ("take profit", "stop loss", "тейк профіт", "стоп лосс"))
+    
+    @staticmethod
+    def _dedupe_signals(signals):
+        """Keep only the most confident signal per (symbol, signal type), in first-seen order"""
+        best = {}
+        for signal in signals:
+            key = (signal.symbol, signal.signal_type)
+            current = best.get(key)
+            if current is None or signal.confidence > current.confidence:
+                best[key] = signal
+        return list(best.values())
+    
+    async def _process_signals(self, signals):
+        """Process a scan's signals: exits concurrently, entries one at a time"""
+        # Duplicates would each fetch the balance and place their own order
+        signals = self._dedupe_signals(signals)
+        # Exits only reduce exposure, so they can overlap; each entry's risk check must see the fills before it
+        exits = [signal for signal in signals if self._is_position_close_signal(signal)]
+        entries = [signal for signal in signals if not self._is_position_close_signal(signal)]
+        
+        if exits and self.is_trading_active:
+            semaphore = asyncio.Semaphore(SIGNAL_CONCURRENCY)
+            
+            async def process_bounded(signal):
+                async with semaphore:
+                    logger.info(f"🔄 Processing signal for {signal.symbol}...")
+                    await self.process_trading_signal(signal)
+            
+            await asyncio.gather(*(process_bounded(signal) for signal in exits), return_exceptions=True)
+        
+        for signal in entries:
+            if not self.is_trading_active:
+                break
+            
+            logger.info(f"🔄 Processing signal for {signal.symbol}...")
+            await self.process_trading_signal(signal)
+    
     async def process_trading_signal(self, signal):
         """Process a trading signal"""
         try:
@@ -979,20 +1427,17 @@ class TradingBot:
             logger.info(f"💼 Processing {signal.signal_type.value} signal for {symbol}")
             
             # Check if this is a position close signal (take profit or stop loss)
-            is_position_close = ("take profit" in signal.reason.lower() or 
-                               "stop loss" in signal.reason.lower() or
-                               "тейк профіт" in signal.reason.lower() or
-                               "стоп лосс" in signal.reason.lower())
+            is_position_close = self._is_position_close_signal(signal)
             
             logger.info(f"🔍 Signal check - Reason: '{signal.reason}', Is close: {is_position_close}, Type: {signal.signal_type.value}")
             
             # If it's a position close signal, handle it differently
-            if is_position_close and signal.signal_type == SignalType.SELL:
+            if is_position_close:
                 logger.info(f"🎯 Detected position close signal for {symbol}")
                 await self.handle_position_close(signal)
                 return
             
-            current_balance = self.binance_client.get_usdt_balance_sync()
+            current_balance = await self._cached_io(self.binance_client.get_usdt_balance_sync, ttl=BALANCE_CACHE_TTL)
             logger.info(f"💰 Current balance: ${current_balance:.2f} USDT")
             
             # Check risk management
@@ -1010,16 +1455,18 @@ class TradingBot:
                 return
             
             # Calculate quantity from USDT amount
-            quantity = self.binance_client.calculate_quantity_from_usdt_sync(symbol, position_size)
+            quantity = await self._run_io(self.binance_client.calculate_quantity_from_usdt_sync, symbol, position_size)
             if not quantity:
                 logger.error(f"Could not calculate quantity for {symbol}")
                 return
             
             # Place the order
             side = 'BUY' if signal.signal_type == SignalType.BUY else 'SELL'
-            order = self.binance_client.place_market_order_sync(symbol, side, quantity)
+            order = await self._run_io(self.binance_client.place_market_order_sync, symbol, side, quantity)
             
             if order:
+                # Margin was just used - the cached balance is stale now
+                self._rest_cache.clear()
                 # Save trade record
                 trade_data = {
                     'symbol': symbol,
@@ -1034,7 +1481,7 @@ class TradingBot:
                     'reason': signal.reason
                 }
                 
-                self.data_storage.save_trade(trade_data)
+                self._trade_write_q.put_nowait(trade_data)
                 self.risk_manager.update_daily_trades()
                 
                 # Update active positions cache in trading strategy
@@ -1060,14 +1507,7 @@ class TradingBot:
 **Довіра сигналу:** {signal.confidence:.1%}
 **Причина:** {signal.reason}
 """
-                    # Send to authorized users
-                    user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-                    
-                    for user_id in user_ids:
-                        try:
-                            self.bot.send_message(user_id, trade_msg, parse_mode='Markdown')
-                        except Exception as e:
-                            logger.error(f"Failed to send trade notification to {user_id}: {e}")
+                    await self._notify_all(trade_msg, "trade")
                 except Exception as e:
                     logger.error(f"Error sending trade notification: {e}")
                 
@@ -1075,7 +1515,7 @@ class TradingBot:
                 if signal.stop_loss:
                     stop_side = 'SELL' if side == 'BUY' else 'BUY'
                     logger.info(f"🛡️ Placing stop-loss: {stop_side} {quantity} {symbol} at {signal.stop_loss}")
-                    stop_order = self.binance_client.place_stop_loss_order_sync(symbol, stop_side, quantity, signal.stop_loss)
+                    stop_order = await self._run_io(self.binance_client.place_stop_loss_order_sync, symbol, stop_side, quantity, signal.stop_loss)
                     if stop_order:
                         logger.info(f"✅ Stop-loss placed: {stop_side} {quantity} {symbol} at {signal.stop_loss}")
                         
@@ -1094,12 +1534,7 @@ class TradingBot:
 **Кількість:** {quantity}
 **Операція:** {stop_side}"""
                             
-                            user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-                            for user_id in user_ids:
-                                try:
-                                    self.bot.send_message(user_id, stop_msg, parse_mode='Markdown')
-                                except Exception as e:
-                                    logger.error(f"Failed to send stop-loss notification to {user_id}: {e}")
+                            await self._notify_all(stop_msg, "stop-loss")
                         except Exception as e:
                             logger.error(f"Error sending stop-loss notification: {e}")
                     else:
@@ -1109,7 +1544,7 @@ class TradingBot:
                 if signal.take_profit:
                     tp_side = 'SELL' if side == 'BUY' else 'BUY'
                     logger.info(f"🎯 Placing take-profit: {tp_side} {quantity} {symbol} at {signal.take_profit}")
-                    tp_order = self.binance_client.place_limit_order_sync(symbol, tp_side, quantity, signal.take_profit)
+                    tp_order = await self._run_io(self.binance_client.place_limit_order_sync, symbol, tp_side, quantity, signal.take_profit)
                     if tp_order:
                         logger.info(f"✅ Take-profit placed: {tp_side} {quantity} {symbol} at {signal.take_profit}")
                         
@@ -1129,12 +1564,7 @@ class TradingBot:
 **Операція:** {tp_side}
 **Очікуваний прибуток:** ~{((signal.take_profit - signal.entry_price) / signal.entry_price * 100):.1f}%"""
                             
-                            user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-                            for user_id in user_ids:
-                                try:
-                                    self.bot.send_message(user_id, tp_msg, parse_mode='Markdown')
-                                except Exception as e:
-                                    logger.error(f"Failed to send take-profit notification to {user_id}: {e}")
+                            await self._notify_all(tp_msg, "take-profit")
                         except Exception as e:
                             logger.error(f"Error sending take-profit notification: {e}")
                     else:
@@ -1149,7 +1579,7 @@ class TradingBot:
         """Check for closed positions and cancel corresponding stop-loss/take-profit orders"""
         try:
             # Get all currently open positions
-            current_positions = self.binance_client.get_open_positions_sync()
+            current_positions = await self._run_io(self.binance_client.get_open_positions_sync)
             current_symbols = {pos['symbol'] for pos in current_positions}
             
             # Get all symbols with saved active orders
@@ -1164,7 +1594,7 @@ class TradingBot:
                     # Cancel stop-loss order if exists
                     if 'stop_loss' in orders:
                         stop_order_id = orders['stop_loss']
-                        if self.binance_client.cancel_order_sync(symbol, stop_order_id):
+                        if await self._run_io(self.binance_client.cancel_order_sync, symbol, stop_order_id):
                             cancelled_orders.append(f"stop-loss {stop_order_id}")
                             logger.info(f"✅ Cancelled stop-loss order {stop_order_id} for {symbol}")
                         else:
@@ -1173,14 +1603,14 @@ class TradingBot:
                     # Cancel take-profit order if exists
                     if 'take_profit' in orders:
                         tp_order_id = orders['take_profit']
-                        if self.binance_client.cancel_order_sync(symbol, tp_order_id):
+                        if await self._run_io(self.binance_client.cancel_order_sync, symbol, tp_order_id):
                             cancelled_orders.append(f"take-profit {tp_order_id}")
                             logger.info(f"✅ Cancelled take-profit order {tp_order_id} for {symbol}")
                         else:
                             logger.warning(f"⚠️ Failed to cancel take-profit order {tp_order_id} for {symbol}")
                     
                     # Update local trade status to closed for this symbol
-                    self.update_closed_trades_status(symbol)
+                    await self.update_closed_trades_status(symbol)
                     
                     # Remove from active orders storage
                     self.data_storage.remove_active_orders(symbol)
@@ -1196,19 +1626,14 @@ class TradingBot:
 
 Це нормальна операція для підтримки чистоти ордерів."""
 
-                            user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-                            for user_id in user_ids:
-                                try:
-                                    self.bot.send_message(user_id, cancel_msg, parse_mode='Markdown')
-                                except Exception as e:
-                                    logger.error(f"Failed to send cancellation notification to {user_id}: {e}")
+                            await self._notify_all(cancel_msg, "cancellation")
                         except Exception as e:
                             logger.error(f"Error sending cancellation notification: {e}")
                             
         except Exception as e:
             logger.error(f"Error checking orphaned orders: {e}")
     
-    def update_closed_trades_status(self, symbol: str):
+    async def update_closed_trades_status(self, symbol: str):
         """Update status of open trades to closed when position is no longer on Binance"""
         try:
             # Get all open trades for this symbol
@@ -1224,7 +1649,7 @@ class TradingBot:
                     trade_id = trade.get('id')
                     if trade_id:
                         # Get current price for P&L calculation
-                        current_price = self.binance_client.get_current_price_sync(symbol)
+                        current_price = await self._run_io(self.binance_client.get_current_price_sync, symbol)
                         
                         if current_price:
                             # Calculate P&L
@@ -1284,12 +1709,12 @@ class TradingBot:
                 
                 # Send Telegram notification with all closed trades
                 if closed_trades_info:
-                    self.send_position_closed_notification(symbol, closed_trades_info, total_pnl)
+                    await self.send_position_closed_notification(symbol, closed_trades_info, total_pnl)
                             
         except Exception as e:
             logger.error(f"Error updating closed trades status for {symbol}: {e}")
     
-    def send_position_closed_notification(self, symbol: str, trades_info: list, total_pnl: float):
+    async def send_position_closed_notification(self, symbol: str, trades_info: list, total_pnl: float):
         """Send detailed Telegram notification about closed positions"""
         try:
             # Determine overall result emoji
@@ -1338,14 +1763,7 @@ class TradingBot:
 ⏰ **Час закриття:** {datetime.now().strftime('%H:%M:%S %d.%m.%Y')}
 🤖 **Причина:** Автоматичне закриття (TP/SL)"""
 
-            # Send to all authorized users
-            user_ids = self.config.AUTHORIZED_USERS if self.config.AUTHORIZED_USERS else []
-            for user_id in user_ids:
-                try:
-                    self.bot.send_message(user_id, msg, parse_mode='Markdown')
-                    logger.info(f"📱 Position closed notification sent to user {user_id}")
-                except Exception as e:
-                    logger.error(f"Failed to send position closed notification to {user_id}: {e}")
+            await self._notify_all(msg, "position closed")
                     
         except Exception as e:
             logger.error(f"Error sending position closed notification: {e}")
@@ -1361,6 +1779,9 @@ class TradingBot:
             initial_balance = await self.binance_client.get_usdt_balance()
             await self.risk_manager.initialize(initial_balance)
             
+            # Load the symbol list for the pairs pages before any handler needs it
+            await self._load_symbols()
+            
             # Load user settings and update monitoring symbols
             user_data = self.data_storage.data.get("user_settings", {})
             if user_data:
@@ -1370,99 +1791,218 @@ class TradingBot:
                 selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
                 if selected_pairs and selected_pairs != self.monitoring_symbols:
                     logger.info(f"Loading user trading pairs: {self.monitoring_symbols} -> {selected_pairs}")
-                    self.monitoring_symbols = selected_pairs.copy()
+                    self.monitoring_symbols = selected_pairs
             
             # Start WebSocket handler
             self.websocket_handler.start(self.monitoring_symbols)
             
-            # Start bot polling in a separate thread
+            self._install_telegram_session()
+            self._trade_writer_task = asyncio.create_task(self._trade_writer())
+            self._settings_flusher_task = asyncio.create_task(self._settings_flusher())
+            
             logger.info("Starting Telegram bot...")
-            polling_thread = threading.Thread(target=self.bot.polling, kwargs={'none_stop': True}, daemon=True)
-            polling_thread.start()
+            if self.config.WEBHOOK_URL:
+                # Telegram pushes each update to our endpoint; no getUpdates round-trips at all
+                polling = asyncio.create_task(self._serve_webhook())
+            else:
+                # Poll Telegram on this event loop; handlers run as coroutines alongside it.
+                # Long polling holds each getUpdates open instead of re-polling idle chats,
+                # and only the update types with handlers are delivered
+                polling = asyncio.create_task(self.bot.infinity_polling(
+                    timeout=TELEGRAM_LONG_POLL_TIMEOUT, request_timeout=TELEGRAM_REQUEST_TIMEOUT,
+                    skip_pending=True, allowed_updates=TELEGRAM_ALLOWED_UPDATES))
+            loop = asyncio.get_running_loop()
+            for sig in (SIGTERM, SIGINT):
+                try:
+                    loop.add_signal_handler(sig, self._shutdown_event.set)
+                except (NotImplementedError, RuntimeError):
+                    pass  # Not supported on this platform; KeyboardInterrupt still ends asyncio.run
+            
+            shutdown_wait = asyncio.create_task(self._shutdown_event.wait())
+            await asyncio.wait({polling, shutdown_wait}, return_when=asyncio.FIRST_COMPLETED)
+            shutdown_wait.cancel()
+            if polling.done():
+                polling.result()  # Surface a polling crash
+            else:
+                logger.info("Shutdown signal received")
+                polling.cancel()
+                try:
+                    await polling
+                except asyncio.CancelledError:
+                    pass
             
-            # Keep the main thread alive
-            while True:
-                await asyncio.sleep(1)
-                
         except Exception as e:
             logger.error(f"Error starting bot: {e}")
             raise
+        finally:
+            await self.shutdown()
+    
+    async def _serve_webhook(self):
+        """Receive Telegram updates on an aiohttp endpoint until cancelled"""
+        path = f"/webhook/{self._webhook_secret}"
+        app = web.Application()
+        app.router.add_post(path, self._handle_webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.config.WEBHOOK_HOST, self.config.WEBHOOK_PORT).start()
+            await self.bot.set_webhook(url=self.config.WEBHOOK_URL.rstrip('/') + path, secret_token=self._webhook_secret,
+                                       allowed_updates=TELEGRAM_ALLOWED_UPDATES, drop_pending_updates=True)
+            logger.info(f"🌐 Webhook listening on {self.config.WEBHOOK_HOST}:{self.config.WEBHOOK_PORT}")
+            await asyncio.get_running_loop().create_future()  # Serve until cancelled
+        finally:
+            # Unregister so a later start in polling mode is not rejected by getUpdates
+            try:
+                await self.bot.remove_webhook()
+            except Exception as e:
+                logger.warning(f"Failed to remove webhook: {e}")
+            await runner.cleanup()
+    
+    async def _handle_webhook(self, request: web.Request) -> web.Response:
+        """Accept one Telegram update and dispatch it in the background"""
+        if request.headers.get('X-Telegram-Bot-Api-Secret-Token') != self._webhook_secret:
+            return web.Response(status=403)
+        payload = await request.read()
+        update = types.Update.de_json(orjson.loads(payload) if orjson is not None else payload.decode())
+        # Acknowledge at once; Telegram retries updates whose request runs long
+        task = asyncio.create_task(self.bot.process_new_updates([update]))
+        self._webhook_tasks.add(task)
+        task.add_done_callback(self._webhook_tasks.discard)
+        return web.Response()
+    
+    @staticmethod
+    def _install_telegram_session():
+        """Give AsyncTeleBot's shared aiohttp session a connector that keeps connections and DNS warm"""
+        manager = asyncio_helper.session_manager
+        connector_kwargs = {"limit": asyncio_helper.REQUEST_LIMIT, "ttl_dns_cache": 600, "keepalive_timeout": 60}
+        ssl_context = getattr(manager, "ssl_context", None)
+        if ssl_context is not None:
+            connector_kwargs["ssl"] = ssl_context
+        # Created on the running loop, so get_session() keeps reusing it rather than replacing it
+        manager.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(**connector_kwargs))
+    
+    async def shutdown(self):
+        """Stop the trading task and close the Telegram and Binance HTTP sessions"""
+        self._trading_event.clear()
+        if self._trading_task is not None:
+            self._trading_task.cancel()
+        if self._trade_writer_task is not None:
+            self._trade_writer_task.cancel()
+        if self._settings_flusher_task is not None:
+            self._settings_flusher_task.cancel()
+        self._io_pool.shutdown(wait=False)
+        self.strategy.shutdown()
+        # Flush trades queued after the writer's last batch
+        pending_trades = []
+        while not self._trade_write_q.empty():
+            pending_trades.append(self._trade_write_q.get_nowait())
+        if pending_trades:
+            self.data_storage.save_trades_batch(pending_trades)
+        await self._flush_user_settings()
+        await self.bot.close_session()
+        await self.binance_client.close()
+        logger.info("Telegram bot stopped")
+    
+    async def _load_symbols(self):
+        """Fetch the exchange symbol list on the I/O pool and index it"""
+        logger.info("Fetching exchange symbols...")
+        try:
+            symbols = await self._run_io(self.binance_client.get_exchange_symbols_sync)
+        except Exception as e:
+            logger.error(f"Error fetching exchange symbols: {e}")
+            symbols = None
+        self._index_symbols(symbols)
     
     def _get_cached_symbols(self):
-        """Get cached symbols, fetch if not cached"""
+        """Get cached symbols; start() loads them, so this never blocks on Binance"""
         if self._cached_symbols is None:
-            logger.info("Fetching exchange symbols for the first time...")
-            self._cached_symbols = self.binance_client.get_exchange_symbols_sync()
-            if not self._cached_symbols:
-                self._cached_symbols = ["ETHUSDT", "BTCUSDT", "ADAUSDT", "DOTUSDT", "LINKUSDT", "BNBUSDT", "XRPUSDT", "SOLUSDT", "AVAXUSDT", "MATICUSDT"]
-            logger.info(f"Cached {len(self._cached_symbols)} symbols")
-        return self._cached_symbols
+            self._index_symbols(None)
+        return self._symbols_upper_cache
+    
+    def _index_symbols(self, symbols: Optional[List[str]]):
+        """Cache a symbol list and build the search indexes, falling back to the default pairs"""
+        self._cached_symbols = symbols or ["ETHUSDT", "BTCUSDT", "ADAUSDT", "DOTUSDT", "LINKUSDT", "BNBUSDT", "XRPUSDT", "SOLUSDT", "AVAXUSDT", "MATICUSDT"]
+        # Upper-case once here so searches never have to normalise symbols again
+        self._symbols_upper_cache = tuple(symbol.upper() for symbol in self._cached_symbols)
+        self._symbols_sorted = sorted(self._symbols_upper_cache)
+        self._symbol_index = {symbol: i for i, symbol in enumerate(self._symbols_upper_cache)}
+        # Index every symbol under each distinct character it contains
+        self._symbols_by_char = {}
+        for symbol in self._symbols_sorted:
+            for char in set(symbol):
+                self._symbols_by_char.setdefault(char, []).append(symbol)
+        self._symbols_version += 1
+        logger.info(f"Cached {len(self._cached_symbols)} symbols")
+
+    @functools.lru_cache(maxsize=64)
+    def _filter_symbols(self, search_query: str, symbols_version: int) -> tuple:
+        """Symbols containing search_query, prefix matches first, memoized per symbol list version"""
+        # Stop one past the cap so callers can tell the result was truncated
+        limit = PAIRS_PER_PAGE * MAX_SEARCH_PAGES
+        # Prefix matches form a contiguous run of the sorted list, found in O(log N)
+        start = bisect_left(self._symbols_sorted, search_query)
+        end = bisect_left(self._symbols_sorted, search_query + "\uffff", start)
+        matches = self._symbols_sorted[start:min(end, start + limit + 1)]
+        if len(matches) <= limit:
+            # Interior matches (e.g. 1000PEPEUSDT for PEPE) still need a scan of the rarest character's bucket
+            candidates = min((self._symbols_by_char.get(char, ()) for char in set(search_query)), key=len)
+            interior = (symbol for symbol in filter(self._search_matcher(search_query), candidates)
+                        if not symbol.startswith(search_query))
+            matches += islice(interior, limit + 1 - len(matches))
+        return tuple(matches)
+
+    @staticmethod
+    def _search_matcher(search_query: str):
+        """Compiled substring predicate so filter() iterates entirely in C"""
+        return re.compile(re.escape(search_query)).search
 
     def _init_user_session(self, user_id: int):
         """Initialize user session for pairs selection"""
         if user_id not in self._user_search_sessions:
-            self._user_search_sessions[user_id] = {
-                "symbols": self._get_cached_symbols().copy(),
-                "search_query": ""
-            }
+            self._user_search_sessions[user_id] = SearchSession(symbols=self._get_cached_symbols())
 
     async def handle_view_pairs_callback(self, call):
         """Handle view pairs callback"""
         self._init_user_session(call.from_user.id)
         await self.show_pairs_page(call, 0)
         
-    async def show_pairs_page(self, call, page: int):
-        """Show trading pairs with pagination"""
+    async def show_pairs_page(self, call, page: int, footer: str = "", answered: bool = False):
+        """Show trading pairs with pagination, optionally with a footer line; answered skips the callback answer"""
         try:
             user_id = call.from_user.id
             self._init_user_session(user_id)
             
             # Get user settings
             user_settings = self.data_storage.get_user_settings(user_id)
-            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS.copy())
+            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
             
             # Get filtered symbols from user session
             session = self._user_search_sessions[user_id]
-            filtered_symbols = session["symbols"]
-            search_query = session["search_query"]
+            filtered_symbols = session.symbols
+            search_query = session.search_query
             
             # Pagination settings
-            pairs_per_page = 5
+            pairs_per_page = PAIRS_PER_PAGE
             total_pages = (len(filtered_symbols) + pairs_per_page - 1) // pairs_per_page
             start_idx = page * pairs_per_page
             end_idx = min(start_idx + pairs_per_page, len(filtered_symbols))
+            found_count = f"{len(filtered_symbols)}+" if session.truncated else str(len(filtered_symbols))
             page_symbols = filtered_symbols[start_idx:end_idx]
+            session.last_page_hash = hash((page, search_query, found_count, tuple(page_symbols)))
             
-            # Build header text with selected pairs info
-            search_info = f" (Пошук: '{search_query}')" if search_query else ""
-            
-            # Show selected pairs (up to 10, then ...)
-            if selected_pairs:
-                if len(selected_pairs) <= 10:
-                    selected_display = ', '.join(selected_pairs)
-                else:
-                    selected_display = ', '.join(selected_pairs[:10]) + '...'
-                selected_info = f"**Вибрані пари ({len(selected_pairs)}):** {selected_display}"
-            else:
-                selected_info = "**Вибрані пари:** Немає"
-            
-            pairs_text = f"""📋 **Торгові Пари** (Сторінка {page + 1}/{total_pages}){search_info}
-
-{selected_info}
-**Знайдено пар:** {len(filtered_symbols)}
-"""
+            pairs_text = self._pairs_page_text(page, total_pages, search_query,
+                                               self._selected_info(session, selected_pairs), found_count, footer)
             
             # Create inline keyboard with pairs
             keyboard = types.InlineKeyboardMarkup(row_width=1)
             
+            selected_set = set(selected_pairs)
+            page_prices = await self._fetch_prices(page_symbols)
             for symbol in page_symbols:
-                is_selected = symbol in selected_pairs
+                is_selected = symbol in selected_set
                 status_emoji = "✅" if is_selected else "❌"
-                try:
-                    current_price = self.binance_client.get_current_price_sync(symbol)
-                    price_str = f" - {format_number(current_price)} USDT" if current_price else ""
-                except:
-                    price_str = ""
+                current_price = page_prices.get(symbol)
+                price_str = f" - {format_number(current_price)} USDT" if current_price else ""
                 
                 button_text = f"{status_emoji} {symbol}{price_str}"
                 keyboard.add(types.InlineKeyboardButton(button_text, callback_data=f"toggle_pair_{symbol}"))
@@ -1491,65 +2031,107 @@ class TradingBot:
             )
             keyboard.add(types.InlineKeyboardButton("⚙️ Назад до Налаштувань", callback_data="settings"))
             
-            # Clear session when going back to settings
-            if user_id in self._user_search_sessions:
-                del self._user_search_sessions[user_id]
-            
-            # Update message
-            self.bot.edit_message_text(pairs_text, call.message.chat.id, call.message.message_id, 
-                                      parse_mode='Markdown', reply_markup=keyboard)
-            
-            # Only answer callback query if it's a real callback (has valid id)
-            if hasattr(call, 'id') and call.id != "fake_search_call":
-                self.bot.answer_callback_query(call.id)
+            # Update message (Telegram rejects byte-identical edits, so skip them)
+            render_key = (call.message.chat.id, call.message.message_id)
+            digest = hashlib.blake2b((pairs_text + keyboard.to_json()).encode()).digest()
+            if self._last_rendered.get(render_key) != digest:
+                # Plain text: the header carries the user's search query, which Markdown could choke on
+                await self._safe_send(self.bot.edit_message_text, pairs_text, call.message.chat.id, call.message.message_id,
+                                          reply_markup=keyboard)
+                self._last_rendered[render_key] = digest
+            session.page = page
+            session.page_message = render_key
+            session.page_text = pairs_text
+            session.keyboard = keyboard
+            
+            # Only answer callback query if it's a real callback (has valid id) not answered yet
+            if not answered and hasattr(call, 'id') and call.id != "fake_search_call":
+                await self._safe_send(self.bot.answer_callback_query, call.id)
             
         except Exception as e:
             logger.error(f"Error showing pairs page: {str(e)}")
-            # Only answer callback query if it's a real callback (has valid id)
-            if hasattr(call, 'id') and call.id != "fake_search_call":
-                self.bot.answer_callback_query(call.id, "❌ Помилка відображення пар.")
+            # Only answer callback query if it's a real callback (has valid id) not answered yet
+            if not answered and hasattr(call, 'id') and call.id != "fake_search_call":
+                await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка відображення пар.")
+    
+    @staticmethod
+    def _selected_info(session: SearchSession, selected_pairs: List[str]) -> str:
+        """Selected pairs line of the pairs page, cached until a toggle or reset clears it"""
+        cached = session.selected_info
+        if cached is not None and cached[0] == len(selected_pairs):
+            return cached[1]
+        
+        # Show selected pairs (up to 10, then ...)
+        if selected_pairs:
+            if len(selected_pairs) <= 10:
+                selected_display = ', '.join(selected_pairs)
+            else:
+                selected_display = ', '.join(selected_pairs[:10]) + '...'
+            selected_info = f"Вибрані пари ({len(selected_pairs)}): {selected_display}"
+        else:
+            selected_info = "Вибрані пари: Немає"
+        session.selected_info = (len(selected_pairs), selected_info)
+        return selected_info
+    
+    @staticmethod
+    def _pairs_page_text(page: int, total_pages: int, search_query: str, selected_info: str,
+                         found_count: str, footer: str = "") -> str:
+        """Header text of the pairs page"""
+        search_info = f" (Пошук: '{search_query}')" if search_query else ""
+        
+        pairs_text = f"""📋 Торгові Пари (Сторінка {page + 1}/{total_pages}){search_info}
+
+{selected_info}
+Знайдено пар: {found_count}
+"""
+        if footer:
+            pairs_text += f"\n{footer}\n"
+        return pairs_text
+    
+    async def _redraw_toggled_pairs(self, call, session: SearchSession, symbols, selected_pairs: List[str]) -> bool:
+        """Patch the toggled buttons of the page on screen; False if any is not there"""
+        chat_id, message_id = call.message.chat.id, call.message.message_id
+        if session.page_message != (chat_id, message_id):
+            return False
+        buttons = {b.callback_data: b for row in session.keyboard.keyboard for b in row}
+        toggled = [buttons.get(f"toggle_pair_{symbol}") for symbol in symbols]
+        if None in toggled:
+            return False
+        
+        # Flip the status emoji only; the cached price text stays as rendered
+        selected_set = set(selected_pairs)
+        for symbol, button in zip(symbols, toggled):
+            button.text = ("✅" if symbol in selected_set else "❌") + button.text[1:]
+        
+        total_pages = (len(session.symbols) + PAIRS_PER_PAGE - 1) // PAIRS_PER_PAGE
+        found_count = f"{len(session.symbols)}+" if session.truncated else str(len(session.symbols))
+        pairs_text = self._pairs_page_text(session.page, total_pages, session.search_query,
+                                           self._selected_info(session, selected_pairs), found_count)
+        
+        if pairs_text == session.page_text:
+            await self._safe_send(self.bot.edit_message_reply_markup, chat_id, message_id, reply_markup=session.keyboard)
+        else:
+            await self._safe_send(self.bot.edit_message_text, pairs_text, chat_id, message_id,
+                                  reply_markup=session.keyboard)
+            session.page_text = pairs_text
+        self._last_rendered[(chat_id, message_id)] = hashlib.blake2b(
+            (pairs_text + session.keyboard.to_json()).encode()).digest()
+        return True
     
     async def handle_modify_settings_callback(self, call):
         """Handle modify settings callback"""
         try:
-            settings_text = f"""
-🔧 **Налаштування Торгівлі**
-
-**Поточні параметри:**
-• Розмір позиції: {format_number(self.config.DEFAULT_TRADE_AMOUNT)} USDT
-• Максимальна позиція: {format_number(self.config.MAX_POSITION_SIZE)} USDT
-• Максимальна просадка: {self.config.MAX_DRAWDOWN_PERCENT}%
-• Стоп-лосс: {self.config.STOP_LOSS_PERCENT}%
-• Тейк-профіт: {self.config.TAKE_PROFIT_PERCENT}%
-
-**Стратегія:**
-• Період тренду: {self.config.TREND_PERIOD}
-• Період RSI: {self.config.RSI_PERIOD}
-• RSI перепроданість: {self.config.RSI_OVERSOLD}
-• RSI перекупленість: {self.config.RSI_OVERBOUGHT}
-
-**Мережа:** {"🟢 Testnet" if self.config.BINANCE_TESTNET else "🔴 Mainnet"}
-**Статус торгівлі:** {"🟢 Активна" if self.is_trading_active else "⏸ Зупинена"}
-
-ℹ️ Для зміни параметрів відредагуйте файл .env та перезапустіть бота
-"""
-            
-            keyboard = types.InlineKeyboardMarkup()
-            if self.is_trading_active:
-                keyboard.add(types.InlineKeyboardButton("⏸ Зупинити торгівлю", callback_data="stop_trading"))
-            else:
-                keyboard.add(types.InlineKeyboardButton("🔄 Почати торгівлю", callback_data="start_trading"))
-            
-            keyboard.add(types.InlineKeyboardButton("📋 Переглянути пари", callback_data="view_pairs"))
-            keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
+            active = self.is_trading_active
+            settings_text = self._modify_settings_texts[active]
+            keyboard = self._modify_settings_kbs[active]
             
-            self.bot.edit_message_text(settings_text, call.message.chat.id, call.message.message_id,
+            await self._safe_send(self.bot.edit_message_text, settings_text, call.message.chat.id, call.message.message_id,
                                       parse_mode='Markdown', reply_markup=keyboard)
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             
         except Exception as e:
             logger.error(f"Error showing modify settings: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка при завантаженні налаштувань.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка при завантаженні налаштувань.")
     
     async def handle_pairs_page_callback(self, call):
         """Handle pagination for pairs"""
@@ -1558,10 +2140,10 @@ class TradingBot:
             await self.show_pairs_page(call, page)
         except Exception as e:
             logger.error(f"Error handling pairs page: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка навігації.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка навігації.")
     
     async def handle_toggle_pair_callback(self, call):
-        """Handle toggling a trading pair"""
+        """Handle toggling a trading pair; the change is saved by _flush_toggles"""
         try:
             symbol = call.data.replace("toggle_pair_", "")
             user_id = call.from_user.id
@@ -1569,62 +2151,110 @@ class TradingBot:
             # Initialize session if needed
             self._init_user_session(user_id)
             
-            # Get current user settings
+            # A second tap on the same pair before the flush cancels the first
+            pending = self._toggle_queue.setdefault(user_id, {})
+            if symbol in pending:
+                del pending[symbol]
+            else:
+                pending[symbol] = None
+            self._toggle_calls[user_id] = call
+            
             user_settings = self.data_storage.get_user_settings(user_id)
-            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS.copy())
+            was_selected = symbol in user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
+            action = "увімкнено" if was_selected != (symbol in pending) else "вимкнено"
+            await self._safe_send(self.bot.answer_callback_query, call.id, f"✅ {symbol} {action}")
             
-            # Toggle the pair
-            if symbol in selected_pairs:
-                selected_pairs.remove(symbol)
-                action = "вимкнено"
-            else:
-                selected_pairs.append(symbol)
-                action = "увімкнено"
+            task = self._toggle_tasks.get(user_id)
+            if task is None or task.done():
+                self._toggle_tasks[user_id] = asyncio.create_task(self._flush_toggles(user_id))
+            
+        except Exception as e:
+            symbol = call.data.replace("toggle_pair_", "") if hasattr(call, 'data') else 'unknown'
+            logger.error(f"Error toggling pair {symbol}: {str(e)}")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка зміни пари.")
+    
+    async def _flush_toggles(self, user_id: int):
+        """Wait for the toggle burst to settle, then apply it"""
+        await asyncio.sleep(TOGGLE_DEBOUNCE_SECONDS)
+        self._toggle_tasks.pop(user_id, None)
+        await self._apply_toggles(user_id)
+    
+    async def _apply_toggles(self, user_id: int, redraw: bool = True):
+        """Apply a user's queued pair toggles with one save and one redraw"""
+        symbols = self._toggle_queue.pop(user_id, None)
+        call = self._toggle_calls.pop(user_id, None)
+        if not symbols:
+            return  # nothing queued, or every tap was undone
+        
+        try:
+            user_settings = self.data_storage.get_user_settings(user_id)
+            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
+            selected_set = set(selected_pairs)
+            removed = {symbol for symbol in symbols if symbol in selected_set}
+            # Build a new list rather than mutating one that may be the config default
+            selected_pairs = [pair for pair in selected_pairs if pair not in removed]
+            selected_pairs.extend(symbol for symbol in symbols if symbol not in selected_set)
             
             # Save updated settings
             user_settings['selected_pairs'] = selected_pairs
-            self.data_storage.save_user_settings(user_id, user_settings)
+            self._save_user_settings_later(user_id, user_settings)
             
-            # Show feedback and refresh page
-            self.bot.answer_callback_query(call.id, f"✅ {symbol} {action}")
+            session = self._user_search_sessions.get(user_id)
+            if session is not None:
+                session.selected_info = None
+            if not redraw or call is None:
+                return
             
+            if session is not None and session.keyboard is not None:
+                if await self._redraw_toggled_pairs(call, session, symbols, selected_pairs):
+                    return
             # Refresh current page - try to determine current page from filtered symbols
-            if user_id in self._user_search_sessions:
-                session = self._user_search_sessions[user_id]
-                try:
-                    symbol_index = session["symbols"].index(symbol) if symbol in session["symbols"] else 0
-                    current_page = symbol_index // 5  # 5 pairs per page
-                except Exception:
-                    current_page = 0
-            else:
-                current_page = 0
+            last_symbol = next(reversed(symbols))
+            current_page = self._symbol_position(session, last_symbol) // PAIRS_PER_PAGE if session is not None else 0
             
-            await self.show_pairs_page(call, current_page)
+            # handle_toggle_pair_callback already answered this call
+            await self.show_pairs_page(call, current_page, answered=True)
             
         except Exception as e:
-            symbol = call.data.replace("toggle_pair_", "") if hasattr(call, 'data') else 'unknown'
-            logger.error(f"Error toggling pair {symbol}: {str(e)}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка зміни пари.")
+            logger.error(f"Error applying pair toggles for user {user_id}: {e}")
+    
+    async def _settle_pending_toggles(self, user_id: int, apply: bool):
+        """Settle queued toggles now, before settings are read or overwritten"""
+        task = self._toggle_tasks.pop(user_id, None)
+        if task is not None:
+            task.cancel()
+        if apply:
+            await self._apply_toggles(user_id, redraw=False)
+        else:
+            self._toggle_queue.pop(user_id, None)
+            self._toggle_calls.pop(user_id, None)
+    
+    def _symbol_position(self, session: SearchSession, symbol: str) -> int:
+        """Position of symbol in the session's symbol list, 0 if absent"""
+        if session.symbols is self._symbols_upper_cache:
+            return self._symbol_index.get(symbol, 0)
+        if session.symbol_index is None:
+            session.symbol_index = {s: i for i, s in enumerate(session.symbols)}
+        return session.symbol_index.get(symbol, 0)
     
     async def handle_apply_pairs_callback(self, call):
         """Apply selected pairs to monitoring"""
         try:
+            await self._settle_pending_toggles(call.from_user.id, apply=True)
             # Get user settings
             user_settings = self.data_storage.get_user_settings(call.from_user.id)
-            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS.copy())
+            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
             
             if not selected_pairs:
-                self.bot.answer_callback_query(call.id, "❌ Виберіть хоча б одну пару!")
+                await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Виберіть хоча б одну пару!")
                 return
             
             # Update monitoring symbols
-            old_symbols = self.monitoring_symbols.copy()
-            self.monitoring_symbols = selected_pairs.copy()
+            old_symbols = self.monitoring_symbols
+            self.monitoring_symbols = selected_pairs
             
-            # Restart WebSocket handler with new symbols
-            self.websocket_handler.stop()
-            await asyncio.sleep(1)  # Give it time to stop
-            self.websocket_handler.start(self.monitoring_symbols)
+            # The ticker stream covers every symbol; only the filter changes
+            self.websocket_handler.set_symbols(self.monitoring_symbols)
             
             # Show success message
             success_text = f"""✅ **Налаштування Застосовано**
@@ -1640,46 +2270,50 @@ class TradingBot:
             keyboard.add(types.InlineKeyboardButton("⚙️ Назад до Налаштувань", callback_data="settings"))
             keyboard.add(types.InlineKeyboardButton("🏠 Головне меню", callback_data="main_menu"))
             
-            self.bot.edit_message_text(success_text, call.message.chat.id, call.message.message_id,
+            await self._safe_send(self.bot.edit_message_text, success_text, call.message.chat.id, call.message.message_id,
                                       parse_mode='Markdown', reply_markup=keyboard)
-            self.bot.answer_callback_query(call.id, f"✅ Застосовано {len(selected_pairs)} пар!")
+            await self._safe_send(self.bot.answer_callback_query, call.id, f"✅ Застосовано {len(selected_pairs)} пар!")
             
             logger.info(f"Monitoring symbols updated: {old_symbols} -> {self.monitoring_symbols}")
             
         except Exception as e:
             logger.error(f"Error applying pairs: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка застосування налаштувань.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка застосування налаштувань.")
     
     async def handle_reset_pairs_callback(self, call):
         """Reset pairs to default"""
         try:
+            await self._settle_pending_toggles(call.from_user.id, apply=False)
             # Get user settings
             user_settings = self.data_storage.get_user_settings(call.from_user.id)
-            user_settings['selected_pairs'] = self.config.DEFAULT_PAIRS.copy()
-            self.data_storage.save_user_settings(call.from_user.id, user_settings)
+            # The only place a default list is stored; copy it so the config list is never aliased
+            user_settings['selected_pairs'] = list(self.config.DEFAULT_PAIRS)
+            self._save_user_settings_later(call.from_user.id, user_settings)
+            session = self._user_search_sessions.get(call.from_user.id)
+            if session is not None:
+                session.selected_info = None
             
-            self.bot.answer_callback_query(call.id, "🔄 Скинуто до стандартних пар!")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "🔄 Скинуто до стандартних пар!")
             
             # Refresh current page
             await self.show_pairs_page(call, 0)
             
         except Exception as e:
             logger.error(f"Error resetting pairs: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка скидання налаштувань.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка скидання налаштувань.")
     
     def update_monitoring_symbols_from_user(self, user_id: int):
         """Update monitoring symbols from user settings"""
         try:
             user_settings = self.data_storage.get_user_settings(user_id)
-            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS.copy())
+            selected_pairs = user_settings.get('selected_pairs', self.config.DEFAULT_PAIRS)
             
             if selected_pairs and selected_pairs != self.monitoring_symbols:
-                old_symbols = self.monitoring_symbols.copy()
-                self.monitoring_symbols = selected_pairs.copy()
+                old_symbols = self.monitoring_symbols
+                self.monitoring_symbols = selected_pairs
                 
-                # Restart WebSocket handler
-                self.websocket_handler.stop()
-                self.websocket_handler.start(self.monitoring_symbols)
+                # The ticker stream covers every symbol; only the filter changes
+                self.websocket_handler.set_symbols(self.monitoring_symbols)
                 
                 logger.info(f"Monitoring symbols updated from user settings: {old_symbols} -> {self.monitoring_symbols}")
                 
@@ -1695,11 +2329,11 @@ class TradingBot:
             self._init_user_session(user_id)
             
             # Send a message asking for search query
-            search_text = """🔍 **Пошук Торгових Пар**
+            search_text = """🔍 Пошук Торгових Пар
 
 Введіть назву криптовалюти або частину назви для пошуку:
 
-**Приклади:**
+Приклади:
 • BTC (знайде BTCUSDT)
 • ETH (знайде ETHUSDT) 
 • DOG (знайде DOGEUSDT)
@@ -1711,20 +2345,21 @@ class TradingBot:
             keyboard.add(types.InlineKeyboardButton("❌ Скасувати", callback_data="view_pairs"))
             
             # Send new message for search input
-            sent_msg = self.bot.send_message(call.message.chat.id, search_text, parse_mode='Markdown', reply_markup=keyboard)
+            sent_msg = await self._safe_send(self.bot.send_message, call.message.chat.id, search_text, reply_markup=keyboard)
             
             # Store message info for cleanup
             if user_id not in self._user_search_sessions:
                 self._init_user_session(user_id)
                 
-            self._user_search_sessions[user_id]["search_message_id"] = sent_msg.message_id
-            self._user_search_sessions[user_id]["original_message_id"] = call.message.message_id
+            session = self._user_search_sessions[user_id]
+            session.search_message_id = sent_msg.message_id
+            session.original_message_id = call.message.message_id
             
-            self.bot.answer_callback_query(call.id)
+            await self._safe_send(self.bot.answer_callback_query, call.id)
             
         except Exception as e:
             logger.error(f"Error in search pairs callback: {str(e)}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка пошуку.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка пошуку.")
     
     async def handle_clear_search_callback(self, call):
         """Handle clear search callback"""
@@ -1734,104 +2369,132 @@ class TradingBot:
             
             # Reset search
             session = self._user_search_sessions[user_id]
-            session["search_query"] = ""
-            session["symbols"] = self._get_cached_symbols().copy()
+            session.search_query = ""
+            session.truncated = False
+            session.symbols = self._get_cached_symbols()
+            session.symbol_index = None
             
-            self.bot.answer_callback_query(call.id, "🔍 Пошук очищено")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "🔍 Пошук очищено")
             await self.show_pairs_page(call, 0)
             
         except Exception as e:
             logger.error(f"Error clearing search: {e}")
-            self.bot.answer_callback_query(call.id, "❌ Помилка очищення пошуку.")
+            await self._safe_send(self.bot.answer_callback_query, call.id, "❌ Помилка очищення пошуку.")
+    
+    async def _delete_message_quietly(self, chat_id: int, message_id: int):
+        """Delete a message, ignoring failures (e.g. already deleted)"""
+        try:
+            await self.bot.delete_message(chat_id, message_id)
+        except Exception as e:
+            logger.debug(f"Could not delete message {message_id}: {e}")
     
     def _setup_search_handler(self):
         """Setup search message handler"""
-        @self.bot.message_handler(func=lambda message: (
-            hasattr(message, 'text') and message.text and 
-            message.from_user.id in self._user_search_sessions and 
-            self._user_search_sessions[message.from_user.id].get("search_message_id") is not None
-        ))
-        def handle_search_input(message):
-            def run_async():
-                asyncio.run(self.process_search_input(message))
-            thread = threading.Thread(target=run_async)
-            thread.start()
+        def is_search_input(message):
+            # Fast path: most non-search updates carry no text at all
+            if not getattr(message, 'text', None):
+                return False
+            session = self._user_search_sessions.get(message.from_user.id)
+            return session is not None and session.search_message_id is not None
+        
+        @self.bot.message_handler(func=is_search_input)
+        async def handle_search_input(message):
+            try:
+                await self.process_search_input(message)
+            except Exception as e:
+                await self._report_search_failure(message.chat.id, e)
+    
+    async def _report_search_failure(self, chat_id: int, error: Exception):
+        """Log an unexpected search failure and tell the user"""
+        logger.error(f"Error processing search input: {error}")
+        try:
+            await self._safe_send(self.bot.send_message, chat_id, "❌ Помилка обробки пошуку.")
+        except Exception as e:
+            logger.warning(f"Could not report search failure: {e}")
     
     async def process_search_input(self, message):
         """Process search input from user"""
-        try:
-            user_id = message.from_user.id
-            if user_id not in self._user_search_sessions:
-                logger.warning(f"User {user_id} not in search sessions")
-                return
-                
-            session = self._user_search_sessions[user_id]
-            if not hasattr(message, 'text') or not message.text:
-                logger.warning(f"No text in message from user {user_id}")
-                return
-                
-            search_query = message.text.strip().upper()
-            logger.info(f"Processing search query: '{search_query}' from user {user_id}")
-            
-            # Filter symbols based on search
-            all_symbols = self._get_cached_symbols()
-            if search_query:
-                filtered_symbols = [symbol for symbol in all_symbols if search_query in symbol]
-            else:
-                filtered_symbols = all_symbols.copy()
-            
-            # Update session
-            session["search_query"] = search_query
-            session["symbols"] = filtered_symbols
+        user_id = message.from_user.id
+        session = self._user_search_sessions.get(user_id)
+        if session is None:
+            logger.warning("User %s not in search sessions", user_id)
+            return
+
+        text = getattr(message, 'text', None)
+        if not text:
+            logger.warning("No text in message from user %s", user_id)
+            return
             
-            # Delete search message and user input
+        # Debounce: let a burst of messages settle and only handle the newest one
+        session.pending_message_id = message.message_id
+        await asyncio.sleep(SEARCH_DEBOUNCE_SECONDS)
+        if session.pending_message_id != message.message_id:
             try:
-                search_msg_id = session.get("search_message_id")
-                if search_msg_id:
-                    self.bot.delete_message(message.chat.id, search_msg_id)
-                self.bot.delete_message(message.chat.id, message.message_id)
+                await self.bot.delete_message(message.chat.id, message.message_id)
             except Exception as delete_error:
-                logger.warning(f"Could not delete messages: {delete_error}")
-            
-            # Update original pairs message
-            original_msg_id = session.get("original_message_id")
-            if original_msg_id:
-                # Create fake call object for show_pairs_page
-                class FakeCall:
-                    def __init__(self, chat_id, message_id, user_id):
-                        self.message = type('', (), {'chat': type('', (), {'id': chat_id})(), 'message_id': message_id})()
-                        self.from_user = type('', (), {'id': user_id})()
-                        self.id = "fake_search_call"  # Add missing id attribute
-                
-                fake_call = FakeCall(message.chat.id, original_msg_id, user_id)
-                await self.show_pairs_page(fake_call, 0)
-                
-                # Send feedback
-                feedback_msg = f"🔍 Знайдено {len(filtered_symbols)} пар за запитом '{search_query}'" if search_query else "🔍 Показано всі пари"
-                try:
-                    feedback = self.bot.send_message(message.chat.id, feedback_msg)
-                    
-                    # Delete feedback after 2 seconds in a separate thread
-                    def delete_feedback():
-                        import time
-                        time.sleep(2)
-                        try:
-                            self.bot.delete_message(message.chat.id, feedback.message_id)
-                        except:
-                            pass
-                    
-                    import threading
-                    threading.Thread(target=delete_feedback, daemon=True).start()
-                except Exception as feedback_error:
-                    logger.warning(f"Could not send feedback: {feedback_error}")
-            
-            # Clean up session search state
-            session.pop("search_message_id", None)
-            session.pop("original_message_id", None)
+                logger.warning("Could not delete superseded search input: %s", delete_error)
+            return
+        session.pending_message_id = None
             
-        except Exception as e:
-            logger.error(f"Error processing search input: {str(e)}")
-            try:
-                self.bot.send_message(message.chat.id, "❌ Помилка обробки пошуку.")
-            except:
-                pass
\ No newline at end of file
+        search_query = text.strip().upper()
+        logger.info("Processing search query: '%s' from user %s", search_query, user_id)
+        
+        if search_query == session.search_query:
+            # The page already shows this query, so only tidy up the prompt and the input
+            await asyncio.gather(*(self._delete_message_quietly(message.chat.id, msg_id)
+                                   for msg_id in (session.search_message_id, message.message_id) if msg_id))
+            session.search_message_id = None
+            session.original_message_id = None
+            return
+        
+        # Filter symbols based on search
+        all_symbols = self._get_cached_symbols()
+        last_query = session.last_query
+        last_filtered = session.last_filtered
+        if search_query and last_query and last_filtered is not None and last_query in search_query:
+            # The new query only narrows the previous one, so refine its complete result set
+            filtered_symbols = sorted(filter(self._search_matcher(search_query), last_filtered),
+                                      key=lambda symbol: (not symbol.startswith(search_query), symbol))
+            truncated = False
+        elif search_query:
+            limit = PAIRS_PER_PAGE * MAX_SEARCH_PAGES
+            matches = self._filter_symbols(search_query, self._symbols_version)
+            truncated = len(matches) > limit
+            filtered_symbols = list(matches[:limit])
+        else:
+            # Share the cached tuple instead of copying the whole universe per session
+            filtered_symbols = all_symbols
+            truncated = False
+        
+        # Update session
+        session.search_query = search_query
+        session.symbols = filtered_symbols
+        session.symbol_index = None
+        session.truncated = truncated
+        # Truncated results are incomplete and cannot seed the next refinement
+        session.last_query = search_query
+        session.last_filtered = None if truncated else filtered_symbols
+        
+        # Delete search message and user input concurrently (independent HTTP calls)
+        delete_ids = [msg_id for msg_id in (session.search_message_id, message.message_id) if msg_id]
+        pending = [self.bot.delete_message(message.chat.id, msg_id) for msg_id in delete_ids]
+        
+        # Update original pairs message, with the search feedback as its footer
+        original_msg_id = session.original_message_id
+        found_count = f"{len(filtered_symbols)}+" if truncated else str(len(filtered_symbols))
+        # Skip the edit entirely when the first page would show the same query, pairs and count
+        page_hash = hash((0, search_query, found_count, tuple(filtered_symbols[:PAIRS_PER_PAGE])))
+        if original_msg_id and page_hash != session.last_page_hash:
+            feedback_msg = f"🔍 Знайдено {found_count} пар за запитом '{search_query}'" if search_query else "🔍 Показано всі пари"
+            # Create fake call object for show_pairs_page
+            fake_call = _FakeCall(message.chat.id, original_msg_id, user_id)
+            pending.append(self.show_pairs_page(fake_call, 0, footer=feedback_msg))
+        
+        # The page edit does not depend on the deletions, so run them together
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning("Could not delete messages: %s", result)
+        
+        # Clean up session search state
+        session.search_message_id = None
+        session.original_message_id = None
\ No newline at end of file
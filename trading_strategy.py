@@ -7,11 +7,17 @@ import asyncio
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Symbols analyzed at once; each analysis makes a few weighted Binance REST calls
+SCAN_CONCURRENCY = 10
+# Seconds one symbol's analysis may take before the scan moves on without it
+SYMBOL_SCAN_TIMEOUT = 20.0
+
 class TrendDirection(Enum):
     UP = "UP"
     DOWN = "DOWN"
@@ -42,6 +48,10 @@ class TrendFollowingStrategy:
         self.data_storage = data_storage
         self.active_positions: Dict[str, Dict] = {}
         self.trend_cache: Dict[str, TrendDirection] = {}
+        # Shared across scans: an analysis that outlived its timeout keeps its slot until its thread ends
+        self._scan_semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+        # One worker per slot, so a slot holder never queues for a thread and its timeout measures only analysis
+        self._scan_pool = ThreadPoolExecutor(max_workers=SCAN_CONCURRENCY, thread_name_prefix="symbol_scan")
         
     def calculate_sma(self, prices: List[float], period: int) -> Optional[float]:
         """Calculate Simple Moving Average"""
@@ -419,22 +429,40 @@ class TrendFollowingStrategy:
     
     async def scan_opportunities(self, symbols: List[str]) -> List[TradingSignal]:
         """Scan multiple symbols for trading opportunities"""
-        signals = []
-        
-        for symbol in symbols:
-            try:
-                signal = self.analyze_symbol(symbol)
-                if signal and signal.signal_type != SignalType.HOLD:
-                    signals.append(signal)
-                    
-            except Exception as e:
-                logger.error(f"Error scanning {symbol}: {e}")
-                continue
+        results = await asyncio.gather(*(self._scan_one(symbol) for symbol in symbols))
+        signals = [signal for signal in results if signal and signal.signal_type != SignalType.HOLD]
         
         # Sort by confidence
         signals.sort(key=lambda x: x.confidence, reverse=True)
         return signals
     
+    async def _scan_one(self, symbol: str) -> Optional[TradingSignal]:
+        """Analyze one symbol on a worker thread, bounded by the scan semaphore"""
+        await self._scan_semaphore.acquire()
+        # analyze_symbol blocks on REST calls; run it off the event loop on the strategy's own pool
+        analysis = asyncio.get_running_loop().run_in_executor(self._scan_pool, self.analyze_symbol, symbol)
+        # A timeout only stops the waiting, not the thread, so the slot is freed when the thread ends
+        analysis.add_done_callback(self._release_scan_slot)
+        try:
+            return await asyncio.wait_for(asyncio.shield(analysis), timeout=SYMBOL_SCAN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Scanning {symbol} timed out after {SYMBOL_SCAN_TIMEOUT:.0f}s, skipping")
+            return None
+        except Exception as e:
+            logger.error(f"Error scanning {symbol}: {e}")
+            return None
+    
+    def _release_scan_slot(self, analysis: asyncio.Future):
+        """Free a scan slot once its analysis thread has finished"""
+        self._scan_semaphore.release()
+        # Retrieve the outcome so an abandoned analysis never logs "exception was never retrieved"
+        if not analysis.cancelled():
+            analysis.exception()
+    
+    def shutdown(self):
+        """Stop the scan pool; analyses already running finish on their own"""
+        self._scan_pool.shutdown(wait=False, cancel_futures=True)
+    
     def update_position(self, symbol: str, position_data: Dict):
         """Update active position data"""
         self.active_positions[symbol] = position_data
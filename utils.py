@@ -3,9 +3,12 @@ Utility functions for the trading bot
 """
 
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Union
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from collections.abc import MutableMapping
 import math
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -300,3 +303,49 @@ def calculate_compound_return(initial_balance: float, final_balance: float, days
     except Exception as e:
         logger.error(f"Error calculating compound return: {e}")
         return 0.0
+
+class TTLCache(MutableMapping):
+    """Bounded mapping whose entries expire ttl seconds after their last use"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+    
+    def _expire(self, now: float):
+        """Drop expired entries (oldest entries are always at the front)"""
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+    
+    def __getitem__(self, key: Hashable) -> Any:
+        now = time.monotonic()
+        expires_at, value = self._data[key]
+        if expires_at <= now:
+            del self._data[key]
+            raise KeyError(key)
+        # Sliding expiration: every access keeps the entry alive
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        return value
+    
+    def __setitem__(self, key: Hashable, value: Any):
+        now = time.monotonic()
+        self._expire(now)
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def __delitem__(self, key: Hashable):
+        del self._data[key]
+    
+    def __iter__(self) -> Iterator[Hashable]:
+        self._expire(time.monotonic())
+        return iter(list(self._data))
+    
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._data)
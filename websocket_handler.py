@@ -6,34 +6,50 @@ import logging
 import asyncio
 import json
 import time
-from typing import Dict, List, Callable, Optional
+from typing import Dict, List, Callable, Optional, Tuple
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
+from binance.streams import BinanceSocketManager
 
 logger = logging.getLogger(__name__)
 
+TICKER_STREAM = '!ticker@arr'  # all-market futures ticker, pushed about once a second
+STREAM_STALE_SECONDS = 30.0  # no frame for this long means the stream is not really connected
+
 class WebSocketHandler:
-    """Handle real-time price data via WebSocket (simplified implementation)"""
+    """Handle real-time price data via the all-market futures ticker stream"""
     
-    def __init__(self, binance_client):
+    def __init__(self, binance_client, wake_threshold_percent: float = 0.5):
         self.binance_client = binance_client
         self.price_callbacks: List[Callable] = []
         self.current_prices: Dict[str, Dict] = {}
+        # symbol -> (price, time.monotonic() of the tick) for every futures symbol, not just monitored ones
+        self.price_cache: Dict[str, Tuple[float, float]] = {}
         self.is_running = False
+        self.symbols: List[str] = []
+        self._symbol_set: frozenset = frozenset()
         self.price_fetch_task = None
+        # Set when a monitored symbol moves wake_threshold_percent from its last wake price
+        self.price_updated = asyncio.Event()
+        self._wake_threshold = wake_threshold_percent / 100
+        self._wake_prices: Dict[str, float] = {}
+        # time.monotonic() of the last frame received, for is_connected()
+        self._last_frame_at: Optional[float] = None
         
     def start(self, symbols: List[str]):
         """Start price monitoring for given symbols"""
         try:
-            if not self.binance_client.sync_client:
-                logger.error("Binance sync client not initialized")
+            if not self.binance_client.client:
+                logger.error("Binance async client not initialized")
                 return False
             
-            self.is_running = True
-            self.symbols = symbols
+            self.set_symbols(symbols)
+            if self.price_fetch_task is not None and not self.price_fetch_task.done():
+                # One all-market stream serves any symbol set; nothing to reconnect
+                return True
             
-            # Start price fetching task
-            self.price_fetch_task = asyncio.create_task(self._fetch_prices_loop())
+            self.is_running = True
+            self.price_fetch_task = asyncio.create_task(self._ticker_stream_loop())
             
             logger.info(f"Price monitoring started for {len(symbols)} symbols")
             return True
@@ -42,44 +58,66 @@ class WebSocketHandler:
             logger.error(f"Error starting price monitoring: {e}")
             return False
     
-    async def _fetch_prices_loop(self):
-        """Continuously fetch prices for monitored symbols"""
+    def set_symbols(self, symbols: List[str]):
+        """Change which symbols get per-symbol price updates and callbacks"""
+        self.symbols = list(symbols)
+        self._symbol_set = frozenset(self.symbols)
+        self._wake_prices = {s: p for s, p in self._wake_prices.items() if s in self._symbol_set}
+    
+    async def _ticker_stream_loop(self):
+        """Consume the !ticker@arr stream, reconnecting on errors"""
         while self.is_running:
             try:
-                if self.binance_client.sync_client:
-                    # Get ticker prices for all symbols
-                    tickers = self.binance_client.sync_client.futures_symbol_ticker()
-                    
-                    # Update prices for monitored symbols
-                    for ticker in tickers:
-                        symbol = ticker['symbol']
-                        if symbol in self.symbols:
-                            price_data = {
-                                'symbol': symbol,
-                                'price': float(ticker['price']),
-                                'timestamp': int(time.time() * 1000)
-                            }
-                            
-                            self.current_prices[symbol] = price_data
-                            self.binance_client._current_prices[symbol] = price_data['price']
-                            
-                            # Call registered callbacks
-                            for callback in self.price_callbacks:
-                                try:
-                                    callback(symbol, price_data)
-                                except Exception as e:
-                                    logger.error(f"Error in price callback: {e}")
-                
-                # Sleep for 1 second before next fetch
-                await asyncio.sleep(1)
+                socket_manager = BinanceSocketManager(self.binance_client.client)
+                # python-binance has no futures !ticker@arr helper; the combined stream endpoint carries it
+                async with socket_manager.futures_multiplex_socket([TICKER_STREAM]) as stream:
+                    logger.info(f"Connected to futures {TICKER_STREAM} stream")
+                    while self.is_running:
+                        msg = await stream.recv()
+                        if msg.get('e') == 'error':
+                            raise ConnectionError(msg.get('m', 'ticker stream error'))
+                        # Combined-stream frames wrap the payload as {'stream': ..., 'data': [...]}
+                        self._last_frame_at = time.monotonic()
+                        self._apply_tickers(msg['data'])
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"Error fetching prices: {e}")
-                await asyncio.sleep(5)  # Wait longer on error
-    
-
+                logger.error(f"Error in ticker stream: {e}")
+                await asyncio.sleep(5)  # Wait before reconnecting
     
-
+    def _apply_tickers(self, tickers: List[Dict]):
+        """Store one ticker array frame; 's' is the symbol and 'c' the last price"""
+        now = time.monotonic()
+        # Keep every symbol's latest price so UI lookups can skip REST entirely
+        self.price_cache.update({ticker['s']: (float(ticker['c']), now) for ticker in tickers})
+        
+        timestamp = int(time.time() * 1000)
+        for ticker in tickers:
+            symbol = ticker['s']
+            if symbol not in self._symbol_set:
+                continue
+            price = self.price_cache[symbol][0]
+            price_data = {
+                'symbol': symbol,
+                'price': price,
+                'timestamp': timestamp
+            }
+            
+            wake_price = self._wake_prices.setdefault(symbol, price)
+            if wake_price and abs(price - wake_price) >= wake_price * self._wake_threshold:
+                self._wake_prices[symbol] = price
+                self.price_updated.set()
+            
+            self.current_prices[symbol] = price_data
+            self.binance_client._current_prices[symbol] = price_data['price']
+            
+            # Call registered callbacks
+            for callback in self.price_callbacks:
+                try:
+                    callback(symbol, price_data)
+                except Exception as e:
+                    logger.error(f"Error in price callback: {e}")
     
     def add_price_callback(self, callback: Callable):
         """Add a callback function for price updates"""
@@ -109,7 +147,7 @@ class WebSocketHandler:
         """Add a new symbol to monitoring"""
         try:
             if symbol not in self.symbols:
-                self.symbols.append(symbol)
+                self.set_symbols(self.symbols + [symbol])
                 logger.info(f"Added {symbol} to price monitoring")
             else:
                 logger.info(f"{symbol} is already being monitored")
@@ -121,7 +159,7 @@ class WebSocketHandler:
         """Remove a symbol from monitoring"""
         try:
             if symbol in self.symbols:
-                self.symbols.remove(symbol)
+                self.set_symbols([s for s in self.symbols if s != symbol])
             
             # Remove from price cache
             if symbol in self.current_prices:
@@ -141,39 +179,34 @@ class WebSocketHandler:
             if self.price_fetch_task:
                 self.price_fetch_task.cancel()
             
+            self.price_fetch_task = None
+            self._last_frame_at = None
             self.current_prices.clear()
             
-            # Close socket manager
-            if self.socket_manager:
-                # The socket manager will close when the async context managers exit
-                self.socket_manager = None
-            
             logger.info("WebSocket handler stopped")
             
         except Exception as e:
             logger.error(f"Error stopping WebSocket handler: {e}")
     
     def is_connected(self) -> bool:
-        """Check if WebSocket is connected and running"""
-        return self.is_running and len(self.streams) > 0
+        """Check if WebSocket is running and has delivered a frame recently"""
+        if not self.is_running or self.price_fetch_task is None or self.price_fetch_task.done():
+            return False
+        return self._last_frame_at is not None and time.monotonic() - self._last_frame_at < STREAM_STALE_SECONDS
     
     async def reconnect(self, symbols: List[str]):
         """Reconnect WebSocket streams"""
         try:
             logger.info("Reconnecting WebSocket streams...")
-            await self.stop()
+            self.stop()
             await asyncio.sleep(2)  # Small delay
-            await self.start(symbols)
+            self.start(symbols)
             
         except Exception as e:
             logger.error(f"Error reconnecting WebSocket: {e}")
     
     def get_connection_status(self) -> Dict[str, bool]:
         """Get connection status for all streams"""
-        status = {}
-        for stream_key in self.streams.keys():
-            # Extract symbol from stream key
-            symbol = stream_key.split('_')[0]
-            status[symbol] = self.is_running
-        
-        return status
+        # All symbols share the single ticker stream
+        connected = self.is_connected()
+        return {symbol: connected for symbol in self.symbols}